@@ -6,11 +6,38 @@ import joblib
 import os
 import shutil
 
+from utils.cache_utils import write_bytes_atomic
+from utils.data_utils import channel_data_dir, list_channels
+from utils.figure_utils import get_figure_cache
+from utils.worker_utils import has_active_jobs, list_jobs, precompute_channel_steps, submit_job, warm_model_steps
+
 st.set_page_config(layout="wide")
 st.title("⚙️ App Settings & File Management")
 
 st.markdown("Use this page to upload new data files, update the model, or reset parts of the app.")
 
+# --- Channel Selection ---
+st.subheader("📺 Channel")
+channel_options = ["Default"] + list_channels() + ["➕ New channel"]
+channel_choice = st.selectbox("Upload files for channel:", channel_options)
+
+if channel_choice == "➕ New channel":
+    channel = st.text_input("New channel key (letters, digits, '-' or '_')").strip()
+    if not channel:
+        # Without a key, uploads would land in the Default channel's data/ folder
+        st.info("✏️ Enter a key for the new channel to continue.")
+        st.stop()
+else:
+    channel = None if channel_choice == "Default" else channel_choice
+
+try:
+    channel_dir = channel_data_dir(channel)
+except ValueError as e:
+    st.error(e)
+    st.stop()
+
+st.divider()
+
 # --- Upload Data Files ---
 st.subheader("📁 Upload Data Files")
 uploaded_files = st.file_uploader(
@@ -20,21 +47,32 @@ uploaded_files = st.file_uploader(
 )
 
 if uploaded_files:
-    os.makedirs("data", exist_ok=True)
+    # The script reruns on every interaction while files stay in the uploader:
+    # save them and queue the precompute only once per upload
+    upload_key = (channel, tuple((file.file_id, file.name, file.size) for file in uploaded_files))
+    submitted = st.session_state.setdefault("submitted_uploads", set())
+
+    if upload_key not in submitted:
+        os.makedirs(channel_dir, exist_ok=True)
+        for file in uploaded_files:
+            file_path = os.path.join(channel_dir, file.name)
+            if os.path.exists(file_path):
+                st.warning(f"⚠️ {file.name} already exists and will be overwritten.")
+            # Atomic, so the background worker never reads a half-written file
+            write_bytes_atomic(file_path, file.getvalue())
+            st.success(f"✅ Uploaded: {file.name}")
 
-    for file in uploaded_files:
-        file_path = f"data/{file.name}"
-        if os.path.exists(file_path):
-            st.warning(f"⚠️ {file.name} already exists and will be overwritten.")
-        with open(file_path, "wb") as f:
-            f.write(file.getbuffer())
-        st.success(f"✅ Uploaded: {file.name}")
+        submitted.add(upload_key)
+        submit_job(f"Precompute {channel or 'Default'} data", precompute_channel_steps(channel))
+        st.info("⏳ Caches are being rebuilt in the background. See **Background Jobs** below.")
+    else:
+        st.caption(f"✅ {len(uploaded_files)} file(s) saved.")
 
     if st.button("📄 Preview Uploaded Files"):
         for file in uploaded_files:
             st.markdown(f"**{file.name}**")
             try:
-                df = pd.read_csv(f"data/{file.name}")
+                df = pd.read_csv(os.path.join(channel_dir, file.name))
                 st.dataframe(df.head())
             except Exception as e:
                 st.error(f"❌ Could not read {file.name}: {e}")
@@ -47,14 +85,45 @@ model_file = st.file_uploader("Upload a new `.pkl` model file", type="pkl")
 
 if model_file:
     try:
-        with open("xgboost_views_model.pkl", "wb") as f:
-            f.write(model_file.getbuffer())
+        upload_key = ("model", model_file.file_id, model_file.name, model_file.size)
+        submitted = st.session_state.setdefault("submitted_uploads", set())
+        if upload_key not in submitted:
+            write_bytes_atomic("xgboost_views_model.pkl", model_file.getvalue())
+            submitted.add(upload_key)
+            submit_job("Warm model", warm_model_steps())
         st.success("✅ Model file replaced successfully.")
     except Exception as e:
         st.error(f"❌ Failed to save model: {e}")
 
 st.divider()
 
+# --- Background Jobs ---
+st.subheader("🛠️ Background Jobs")
+
+col_refresh, col_rebuild = st.columns(2)
+with col_refresh:
+    st.button("🔄 Refresh Status")
+with col_rebuild:
+    if st.button("♻️ Rebuild Caches for Channel"):
+        submit_job(f"Precompute {channel or 'Default'} data", precompute_channel_steps(channel))
+
+jobs = list_jobs()
+if not jobs:
+    st.caption("No background jobs yet. Uploading data or a model starts one.")
+for job in jobs:
+    status_icon = {"queued": "🕒", "running": "⏳", "done": "✅", "failed": "❌"}[job["status"]]
+    st.markdown(f"{status_icon} **{job['name']}** — {job['message']}")
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"])
+    elif job["status"] == "failed":
+        with st.expander("Error details"):
+            st.code(job["error"])
+
+if has_active_jobs():
+    st.caption("Jobs are still running. Click **Refresh Status** to update.")
+
+st.divider()
+
 # --- Maintenance Utilities ---
 st.subheader("🧹 Maintenance")
 
@@ -66,6 +135,22 @@ if st.button("🧽 Clear Cached Data"):
     except Exception as e:
         st.error(f"⚠️ Failed to clear cache: {e}")
 
+# --- Figure Cache ---
+st.markdown("#### 📊 Chart Cache")
+figure_cache = get_figure_cache()
+figure_stats = figure_cache.stats()
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Cached Charts", figure_stats["entries"])
+col2.metric("Memory Used", f"{figure_stats['bytes'] / 2**20:.1f} / {figure_stats['max_bytes'] / 2**20:.0f} MB")
+col3.metric("Hit Rate", f"{figure_stats['hit_rate']:.0%}", help=f"{figure_stats['hits']} hits, {figure_stats['misses']} misses")
+col4.metric("Build Time Saved", f"{figure_stats['saved_seconds']:.1f} s")
+st.caption(f"{figure_stats['evictions']} charts evicted to stay within the memory budget.")
+
+if st.button("🗑️ Clear Chart Cache"):
+    figure_cache.clear()
+    st.success("✅ Chart cache cleared.")
+
 st.divider()
 
 # --- Show Current Model Info ---
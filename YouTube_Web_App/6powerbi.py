@@ -1,7 +1,13 @@
 # pages/5powerbi.py
 
+import os
 import streamlit as st
 
+from utils.data_utils import DATA_FILES, select_channel
+from utils.export_utils import (DEFAULT_EXTRACT_NAME, MANIFEST_FILE, PARTITION_COLUMNS, export_dir, load_manifest,
+                                manifest_summary)
+from utils.worker_utils import export_extract_steps, list_jobs, submit_job
+
 st.set_page_config(layout="wide")
 st.title("📊 Power BI Dashboard")
 
@@ -25,3 +31,51 @@ if "powerbi.com" not in embed_url or "YOUR_EMBED_CODE_HERE" in embed_url:
     st.error("❌ Please set a valid Power BI 'publish to web' embed URL.")
 else:
     st.components.v1.iframe(embed_url, height=800, width="100%")
+
+# --- Incremental Extract ---
+st.markdown("---")
+st.subheader("📦 Incremental Extract for Power BI")
+st.markdown("""
+Export the datasets and predictions as partitioned Parquet files with a `manifest.json`.
+Only partitions whose content changed since the last export are rewritten, so a Power BI
+**Folder** source pointed at the extract only picks up the deltas.
+""")
+
+channel = select_channel()
+extract_name = st.text_input("Extract name (letters, digits, '-' or '_'):", DEFAULT_EXTRACT_NAME)
+try:
+    # Extracts always live inside the channel's folder of the export root
+    out_dir = export_dir(channel, extract_name.strip())
+except ValueError as e:
+    st.error(e)
+    st.stop()
+st.caption(f"📁 Extract folder: `{out_dir}`")
+tables = st.multiselect(
+    "Tables to export:",
+    list(DATA_FILES) + ["predictions"],
+    default=list(DATA_FILES) + ["predictions"],
+    format_func=lambda table: f"{table} (by {PARTITION_COLUMNS.get(table) or 'none'})",
+)
+
+col_export, col_refresh = st.columns(2)
+with col_export:
+    if st.button("📤 Export Changed Partitions", disabled=not tables):
+        submit_job(f"Power BI extract to {out_dir}", export_extract_steps(out_dir, tables, channel))
+        st.info("⏳ Export started in the background.")
+with col_refresh:
+    st.button("🔄 Refresh Status")
+
+for job in [job for job in list_jobs() if job["name"] == f"Power BI extract to {out_dir}"][:1]:
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"], text=job["message"])
+    elif job["status"] == "failed":
+        st.error(f"❌ {job['message']}")
+    else:
+        st.success("✅ Last export finished.")
+
+manifest = load_manifest(out_dir)
+if manifest["tables"]:
+    st.markdown(f"**Current extract** (`{os.path.join(out_dir, MANIFEST_FILE)}`)")
+    st.dataframe(manifest_summary(manifest), use_container_width=True)
+else:
+    st.caption("No extract in this folder yet.")
@@ -7,8 +7,15 @@ import plotly.graph_objects as go
 import joblib
 import io
 
-from utils.model_utils import load_model, predict_views
-from utils.data_utils import load_all_data
+import numpy as np
+import time
+
+from utils.model_utils import build_whatif_grid, load_model, predict_views, predict_views_batch
+from utils.data_utils import cache_dir, load_all_data, select_channel
+from utils.figure_utils import cached_figure
+from utils.drift_utils import (PREDICTION_COLUMN, PSI_ALERT, PSI_WARN, bin_comparison, clear_scored_batches,
+                               drift_history, drift_report, get_drift_monitor, get_drift_reference,
+                               record_scored_batch)
 from sklearn.model_selection import train_test_split
 from xgboost import XGBRegressor
 
@@ -24,9 +31,18 @@ if model is None:
     st.error("❌ Model failed to load. Please ensure the model file is available and try again.")
     st.stop()
 
-video_data, _, _, _ = load_all_data()
+channel = select_channel()
+video_data, _, _, _ = load_all_data(channel=channel)
 expected_columns = list(video_data.drop(columns=["video_id", "title", "views"], errors="ignore").columns)
 
+# Training features and the model's predictions on them: the baseline scored batches are compared against
+drift_cache_dir = cache_dir(channel)
+try:
+    drift_reference, drift_fingerprint = get_drift_reference(video_data, model, channel)
+except Exception as e:
+    drift_reference, drift_fingerprint = None, None
+    st.warning(f"⚠️ Drift monitoring unavailable: {e}")
+
 # --- Input Tabs ---
 tab1, tab2 = st.tabs(["🎯 Use Sample Row", "📄 Upload New Data"])
 input_data = None
@@ -54,13 +70,20 @@ with tab2:
             if st.checkbox("🔁 Predict All Rows"):
                 clean_input = uploaded_df[expected_columns]
                 try:
-                    preds = predict_views(model, clean_input)
+                    preds = predict_views_batch(model, clean_input)
                     results_df = uploaded_df.copy()
                     results_df["Predicted_Views"] = preds.astype(int)
                     st.dataframe(results_df[["title", "Predicted_Views"]] if "title" in results_df else results_df)
 
                     csv = results_df.to_csv(index=False).encode("utf-8")
                     st.download_button("📅 Download Predictions", data=csv, file_name="predictions.csv", mime="text/csv")
+
+                    # Only the sketches are updated; the scored rows are not kept
+                    if drift_reference is not None:
+                        scored = clean_input[drift_reference.columns.drop(PREDICTION_COLUMN)].copy()
+                        scored[PREDICTION_COLUMN] = preds
+                        record_scored_batch(drift_reference, scored, cache_dir=drift_cache_dir,
+                                            reference_fingerprint=drift_fingerprint)
                 except Exception as e:
                     st.error(f"❌ Prediction failed: {e}")
             else:
@@ -83,6 +106,141 @@ if input_data is not None and not input_data.empty:
     except Exception as e:
         st.error(f"❌ Prediction error: {e}")
 
+# --- What-If Sensitivity Sweep ---
+st.markdown("---")
+st.subheader("🧪 What-If Sensitivity")
+
+if input_data is not None and not input_data.empty:
+    model_features = model.get_booster().feature_names
+    sweep_features = st.multiselect(
+        "Features to vary (one for a curve, two for a heatmap):",
+        model_features,
+        default=[f for f in ["Impressionss click-through rate (%)"] if f in model_features],
+        max_selections=2,
+    )
+
+    sweeps = {}
+    for feature in sweep_features:
+        reference = video_data[feature] if feature in video_data.columns else input_data[feature]
+        if pd.api.types.is_numeric_dtype(reference):
+            low, high = float(reference.min()), float(reference.max())
+            base_value = float(input_data[feature].iloc[0])
+            low, high = min(low, base_value), max(high, base_value)
+            if low == high:
+                high = low + 1.0
+            col_range, col_steps = st.columns([3, 1])
+            with col_range:
+                value_range = st.slider(f"Range of {feature}", low, high, (low, high))
+            with col_steps:
+                steps = st.number_input(f"Steps for {feature}", min_value=2, max_value=200, value=50)
+            sweeps[feature] = np.linspace(value_range[0], value_range[1], int(steps))
+        else:
+            # Categorical features (e.g. Publish Weekday) are swept over their observed values
+            sweeps[feature] = st.multiselect(
+                f"Values of {feature}", sorted(reference.dropna().unique()), default=sorted(reference.dropna().unique())
+            )
+
+    if sweeps and all(len(values) for values in sweeps.values()):
+        try:
+            grid = build_whatif_grid(input_data, sweeps)
+            started = time.perf_counter()
+            # The whole grid is scored in one batched model call
+            grid["Predicted Views"] = predict_views_batch(model, grid)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            st.caption(f"Scored {len(grid):,} scenarios in {elapsed_ms:.0f} ms")
+
+            if len(sweeps) == 1:
+                feature = sweep_features[0]
+                fig = px.line(grid, x=feature, y="Predicted Views", markers=len(grid) <= 50,
+                              title=f"Predicted Views vs {feature}")
+                base_value = input_data[feature].iloc[0]
+                base_prediction = predict_views(model, input_data)
+                fig.add_trace(go.Scatter(x=[base_value], y=[base_prediction], mode="markers",
+                                         marker=dict(size=12, color="red"), name="Current value"))
+            else:
+                x_feature, y_feature = sweep_features
+                heatmap = grid.pivot_table(index=y_feature, columns=x_feature, values="Predicted Views")
+                fig = px.imshow(
+                    heatmap,
+                    origin="lower",
+                    aspect="auto",
+                    color_continuous_scale="Viridis",
+                    labels=dict(x=x_feature, y=y_feature, color="Predicted Views"),
+                    title=f"Predicted Views by {x_feature} and {y_feature}",
+                )
+            st.plotly_chart(fig, use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ What-if sweep failed: {e}")
+else:
+    st.info("Select a single video row to explore what-if scenarios.")
+
+# --- Drift Monitor ---
+st.markdown("---")
+st.subheader("🩺 Drift Monitor")
+st.caption(
+    "Compares every batch scored with **Predict All Rows** to the training data, using fixed histograms cut at "
+    f"the training deciles. PSI ≥ {PSI_WARN} is a moderate shift, ≥ {PSI_ALERT} a significant one."
+)
+
+if drift_reference is not None:
+    monitor = get_drift_monitor(drift_reference, cache_dir=drift_cache_dir, reference_fingerprint=drift_fingerprint)
+
+    if not monitor["history"]:
+        st.info("No scored batches yet. Upload a CSV and use **Predict All Rows** to start monitoring.")
+    else:
+        report = drift_report(monitor)
+        latest = monitor["history"][-1]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Scored Batches", f"{len(monitor['history']):,}")
+        col2.metric("Scored Rows", f"{sum(entry['n_rows'] for entry in monitor['history']):,}")
+        col3.metric("Drifting Features", f"{(report['Status'] != 'stable').sum()} / {len(report)}")
+
+        significant = report.loc[report["Status"] == "significant", "Feature"].tolist()
+        moderate = report.loc[report["Status"] == "moderate", "Feature"].tolist()
+        if PREDICTION_COLUMN in significant:
+            st.error("🚨 The distribution of predicted views has shifted significantly from training.")
+        if significant:
+            st.error(f"🚨 Significant drift in: {', '.join(significant)}")
+        if moderate:
+            st.warning(f"⚠️ Moderate drift in: {', '.join(moderate)}")
+        if not significant and not moderate:
+            st.success("✅ Scored data matches the training distribution.")
+
+        status_icons = {"stable": "🟢", "moderate": "🟠", "significant": "🔴", "no data": "⚪"}
+        report["Status"] = report["Status"].map(lambda status: f"{status_icons[status]} {status}")
+        st.dataframe(report.round(4), use_container_width=True)
+
+        # Trend of the per-batch drift
+        metric = st.radio("Trend metric:", ["PSI", "KS"], horizontal=True)
+        history = drift_history(monitor, metric.lower())
+        trend_features = st.multiselect(
+            "Features to plot:", report["Feature"].tolist(), default=report["Feature"].head(5).tolist()
+        )
+        fig = px.line(
+            history[history["Feature"].isin(trend_features)],
+            x="Batch", y="Value", color="Feature", markers=True,
+            hover_data=["Scored At", "Rows"], title=f"{metric} per Scored Batch",
+        )
+        if metric == "PSI":
+            fig.add_hline(y=PSI_WARN, line_dash="dot", line_color="orange")
+            fig.add_hline(y=PSI_ALERT, line_dash="dash", line_color="red")
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Reference vs scored distribution of one feature
+        compare_feature = st.selectbox("Compare distributions of:", report["Feature"].tolist())
+        bins = bin_comparison(monitor, compare_feature).melt(
+            id_vars="Bin", var_name="Data", value_name="Share of Rows"
+        )
+        fig = px.bar(bins, x="Bin", y="Share of Rows", color="Data", barmode="group",
+                     title=f"{compare_feature}: Training vs Scored")
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.caption(f"Last batch: {latest['n_rows']:,} rows at {pd.to_datetime(latest['time'], unit='s'):%Y-%m-%d %H:%M} UTC")
+        if st.button("🧹 Reset Drift Statistics"):
+            clear_scored_batches(drift_reference, cache_dir=drift_cache_dir, reference_fingerprint=drift_fingerprint)
+            st.rerun()
+
 # --- Feature Importance ---
 st.markdown("---")
 st.subheader("🔍 Feature Importance")
@@ -103,23 +261,27 @@ if hasattr(model, 'feature_importances_'):
     }
     importance_df["Explanation"] = importance_df["Feature"].map(feature_explanations)
 
-    fig = px.bar(
-        importance_df.head(15),
-        x="Importance",
-        y="Feature",
-        orientation="h",
-        color="Importance",
-        color_continuous_scale="Turbo",
-        title="Top Feature Importances",
-        hover_data=["Explanation"]
-    )
-    fig.update_layout(
-        plot_bgcolor="#f9f9f9",
-        paper_bgcolor="#f9f9f9",
-        font=dict(size=13),
-        title_font=dict(size=20),
-        height=500
-    )
+    def importance_chart():
+        fig = px.bar(
+            importance_df.head(15),
+            x="Importance",
+            y="Feature",
+            orientation="h",
+            color="Importance",
+            color_continuous_scale="Turbo",
+            title="Top Feature Importances",
+            hover_data=["Explanation"]
+        )
+        fig.update_layout(
+            plot_bgcolor="#f9f9f9",
+            paper_bgcolor="#f9f9f9",
+            font=dict(size=13),
+            title_font=dict(size=20),
+            height=500
+        )
+        return fig
+
+    fig = cached_figure("feature_importance", importance_df, importance_chart)
     st.plotly_chart(fig, use_container_width=True)
 
     # --- Downloadable Report ---
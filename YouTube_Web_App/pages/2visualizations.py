@@ -7,11 +7,33 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from prophet import Prophet
 from prophet.plot import plot_plotly
-from utils.data_utils import load_all_data
+from utils.data_utils import (aggregate_channels, cache_dir, dataset_version, list_channels, load_dataset,
+                              read_dataset_file, select_channel)
+from utils.figure_utils import cached_figure
+from utils.query_utils import source_columns
+from utils.segment_utils import VIDEO_FEATURES, segment_rows, segment_summary
+from utils.summary_utils import ROLLUP_METRICS, get_dashboard_summary
 
 # Title and Introduction
 st.title("📈 Data Visualizations")
 
+
+# Stored data is keyed on its file version (path, mtime, size), so reruns neither
+# load nor fingerprint the video data; it is only read again when the file changes.
+@st.cache_data(show_spinner=False, max_entries=16)
+def stored_dashboard_summary(channel, version):
+    video_data = read_dataset_file(version[0])
+    return get_dashboard_summary(video_data, cache_dir=cache_dir(channel), source=version[0])
+
+
+@st.cache_resource(show_spinner="Segmenting videos...", max_entries=8)
+def stored_video_segments(channel, version, n_segments, _refit=False):
+    video_data = read_dataset_file(version[0])
+    return segment_rows(video_data, VIDEO_FEATURES, n_segments=n_segments, cache_dir=cache_dir(channel), refit=_refit)
+
+
+channel = select_channel()
+
 # --- Upload New Data CSV ---
 st.sidebar.subheader("📂 Upload Data")
 uploaded_file = st.sidebar.file_uploader("Upload Video and Daily Views Data CSV", type="csv")
@@ -30,17 +52,21 @@ with st.spinner("Loading data..."):
                                'Your Estmated Revenue (USD)', 'Performance']].copy()
         
         daily_views = new_data[['Video publish date', 'Views']].copy()  # Assuming these are the columns for daily views
+        video_columns = set(video_data.columns) if not video_data.empty else set()
 
     else:
-        # Load the existing data if no new file is uploaded
+        # Load the existing data if no new file is uploaded; video data is only
+        # read through the cached summary and segments below
         try:
-            video_data, _, daily_views, _ = load_all_data()
+            daily_views = load_dataset("daily_views", channel=channel)
+            video_version = dataset_version("video_data", channel=channel)
+            video_columns = set(source_columns(video_version[0])) if video_version is not None else set()
         except Exception as e:
             st.error(f"❌ Failed to load data: {e}")
             st.stop()
 
 # --- Handle Empty Data ---
-if video_data.empty or daily_views.empty:
+if not video_columns or daily_views.empty:
     st.warning("🚫 No video or daily view data available. Please upload the data and try again.")
     st.stop()
 
@@ -59,11 +85,19 @@ if "Video publish date" in daily_views.columns:
             (daily_views["Video publish date"] <= pd.to_datetime(date_range[1]))
         ].copy()
 
+# --- Dashboard Summary ---
+# Top lists, rollups and chart projections are precomputed once per data version;
+# stored data keeps its summary on disk, uploaded data is summarized per render.
+if uploaded_file is not None:
+    summary = get_dashboard_summary(video_data)
+else:
+    summary = stored_dashboard_summary(channel, video_version)
+
 # --- Top Performing Videos ---
 st.subheader("🔥 Top Performing Videos")
 
-if "Views" in video_data.columns:
-    top_videos = video_data.sort_values(by="Views", ascending=False).head(10)
+if summary["top_videos"] is not None:
+    top_videos = summary["top_videos"].copy()
 
     # Calculate lower and upper ranges for views (±10%)
     top_videos["view_lower"] = (top_videos["Views"] * 0.90).astype(int)  # Lower range (10% less)
@@ -72,7 +106,7 @@ if "Views" in video_data.columns:
     st.dataframe(top_videos[["Video title", "Views", "view_lower", "view_upper"]])
 
     # Bar chart for Top Performing Videos
-    fig = px.bar(
+    fig = cached_figure("top_videos", top_videos, lambda: px.bar(
         top_videos,
         x="Views",
         y="Video title",
@@ -81,7 +115,7 @@ if "Views" in video_data.columns:
         color="Views",  # Using color to visually differentiate based on Views
         color_continuous_scale="Viridis",  # Color scale applied to Views
         height=400
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.warning("⚠️ 'Views' column is missing from video data.")
@@ -89,28 +123,51 @@ else:
 # --- Performance by Publish Month (Bar Chart) ---
 st.subheader("📅 Performance by Publish Month")
 
-if "Publish Month" in video_data.columns:
-    performance_by_month = video_data.groupby("Publish Month")[["Views", "Subscribers gained", "Your Estmated Revenue (USD)"]].sum().reset_index()
+if summary["monthly"] is not None:
+    performance_by_month = summary["monthly"]
 
-    fig = px.bar(
+    fig = cached_figure("monthly_performance", performance_by_month, lambda: px.bar(
         performance_by_month,
         x="Publish Month",
         y=["Views", "Subscribers gained", "Your Estmated Revenue (USD)"],
         title="Performance by Publish Month",
         barmode="stack",  # Stacked bar chart to show different metrics for each month
         color_discrete_sequence=px.colors.qualitative.Set3,
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.warning("⚠️ 'Publish Month' column is missing.")
 
+# --- Performance by Publish Weekday (Bar Chart) ---
+st.subheader("🗓️ Performance by Publish Weekday")
+
+if summary["weekday"] is not None:
+    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    performance_by_weekday = summary["weekday"]
+
+    fig = cached_figure("weekday_performance", performance_by_weekday, lambda: px.bar(
+        performance_by_weekday,
+        x="Publish Weekday",
+        y="Views",
+        title="Views by Publish Weekday",
+        color="Views",
+        color_continuous_scale="Viridis",
+        category_orders={"Publish Weekday": weekday_order},
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+
+    if summary["weekend"] is not None:
+        st.dataframe(summary["weekend"], use_container_width=True)
+else:
+    st.warning("⚠️ 'Publish Weekday' column is missing.")
+
 # --- Revenue vs. Views (Scatter Plot) ---
 st.subheader("💰 Views vs Revenue")
 
-if "Views" in video_data.columns and "RPM (USD)" in video_data.columns and "Your Estmated Revenue (USD)" in video_data.columns:
-    revenue_vs_views = video_data[["Views", "RPM (USD)", "Your Estmated Revenue (USD)"]]
+if summary["revenue_vs_views"] is not None:
+    revenue_vs_views = summary["revenue_vs_views"]
 
-    fig = px.scatter(
+    fig = cached_figure("revenue_vs_views", revenue_vs_views, lambda: px.scatter(
         revenue_vs_views,
         x="Views",
         y="Your Estmated Revenue (USD)",
@@ -118,7 +175,7 @@ if "Views" in video_data.columns and "RPM (USD)" in video_data.columns and "Your
         color="RPM (USD)",
         color_continuous_scale="YlOrRd",  # Color scale for RPM
         labels={"Views": "Views", "Your Estmated Revenue (USD)": "Estimated Revenue (USD)", "RPM (USD)": "RPM (USD)"}
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.warning("⚠️ 'Views', 'RPM (USD)', or 'Your Estmated Revenue (USD)' column is missing.")
@@ -128,10 +185,10 @@ else:
 # --- Click-Through Rate (CTR) vs. Impressions (Scatter Plot) ---
 st.subheader("📊 Click-Through Rate (CTR) vs. Impressions")
 
-if "Impressions" in video_data.columns and "Impressionss click-through rate (%)" in video_data.columns:
-    ctr_vs_impressions = video_data[["Video title", "Impressions", "Impressionss click-through rate (%)"]]
+if summary["ctr_vs_impressions"] is not None:
+    ctr_vs_impressions = summary["ctr_vs_impressions"]
 
-    fig = px.scatter(
+    fig = cached_figure("ctr_vs_impressions", ctr_vs_impressions, lambda: px.scatter(
         ctr_vs_impressions,
         x="Impressions",
         y="Impressionss click-through rate (%)",
@@ -140,7 +197,63 @@ if "Impressions" in video_data.columns and "Impressionss click-through rate (%)"
         color="Impressionss click-through rate (%)",
         color_continuous_scale="Viridis",
         labels={"Impressions": "Impressions", "Impressionss click-through rate (%)": "CTR (%)"}
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.warning("⚠️ 'Impressions' or 'Impressionss click-through rate (%)' columns are missing.")
+
+# --- Video Segments (Mini-Batch KMeans) ---
+st.subheader("🧩 Video Segments")
+
+if set(VIDEO_FEATURES) <= video_columns:
+    n_segments = st.sidebar.slider("Number of video segments", min_value=2, max_value=8, value=4)
+    refit = st.button("🔁 Refit Video Segments")
+    try:
+        # Centroids are fitted once and reused; appended videos are only assigned to them
+        if uploaded_file is not None:
+            segmented_videos = segment_rows(video_data, VIDEO_FEATURES, n_segments=n_segments, refit=refit)
+        else:
+            if refit:
+                stored_video_segments.clear()
+            segmented_videos = stored_video_segments(channel, video_version, n_segments, _refit=refit)
+
+        st.dataframe(segment_summary(segmented_videos, VIDEO_FEATURES), use_container_width=True)
+
+        # Keyed on the assignments, so a refit with the same data still redraws it
+        fig = cached_figure("video_segments", segmented_videos, lambda: px.scatter(
+            segmented_videos[segmented_videos["Segment"] >= 0].astype({"Segment": str}),
+            x="PC1",
+            y="PC2",
+            color="Segment",
+            hover_name="Video title" if "Video title" in segmented_videos.columns else None,
+            title="Video Segments (PCA Projection)",
+            color_discrete_sequence=px.colors.qualitative.Set2,
+        ))
+        st.plotly_chart(fig, use_container_width=True)
+    except Exception as e:
+        st.warning(f"⚠️ Could not build video segments: {e}")
+else:
+    st.warning(f"⚠️ Video segments need the columns: {', '.join(VIDEO_FEATURES)}")
+
+# --- Cross-Channel Overview ---
+if len(list_channels()) > 1:
+    st.subheader("🌐 Cross-Channel Overview")
+
+    channel_totals = aggregate_channels(
+        "video_data",
+        values=tuple(ROLLUP_METRICS),
+    )
+    if channel_totals.empty:
+        st.warning("⚠️ No channel has the required video data columns.")
+    else:
+        st.dataframe(channel_totals.sort_values(by="Views", ascending=False), use_container_width=True)
+
+        fig = px.bar(
+            channel_totals,
+            x="channel",
+            y="Views",
+            title="Total Views by Channel",
+            color="Views",
+            color_continuous_scale="Viridis",
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -1,12 +1,39 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
+from utils.dedup_utils import (CHUNK_SIZE as DEDUP_CHUNK_SIZE, add_duplicate_clusters, collapse_duplicates,
+                               get_duplicate_clusters)
+from utils.figure_utils import cached_figure
+from utils.query_utils import distinct_values, group_aggregate, select_rows, source_columns, top_k
+from utils.segment_utils import COMMENTER_FEATURES, commenter_features, segment_rows, segment_summary
+from utils.data_utils import cache_dir, dataset_path, dataset_version, load_all_data, select_channel
+from utils.text_utils import clean_comments, get_term_counts, top_terms, wordcloud_png
 
 # Title and Introduction
 st.title("💬 Sentiment Analysis")
 
+COMMENT_QUERIES = {
+    "source_columns": source_columns,
+    "distinct_values": distinct_values,
+    "select_rows": select_rows,
+    "group_aggregate": group_aggregate,
+    "top_k": top_k,
+    "commenter_features": commenter_features,
+}
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def comment_query(name, source, version, *args, **kwargs):
+    # `version` (mtime and size of a stored file) invalidates results when the file changes;
+    # in-memory frames are hashed by content instead
+    return COMMENT_QUERIES[name](source, *args, **kwargs)
+
+
+channel = select_channel()
+
 # --- Upload Comments Data CSV ---
 st.sidebar.subheader("📂 Upload Comments Data")
 uploaded_file = st.sidebar.file_uploader("Upload Comments Data CSV", type="csv")
@@ -19,44 +46,109 @@ if uploaded_file is not None:
     except Exception as e:
         st.error(f"❌ Failed to load the uploaded file: {e}")
         st.stop()
+    comments_version = None
 
 else:
-    st.warning("Please upload a comments dataset to proceed.")
-    st.stop()
+    # Fall back to the channel's stored comments, queried lazily instead of loaded:
+    # only aggregates, top lists and the filtered slice below are read into memory
+    comments_data = dataset_path("comments", channel=channel)
+    if comments_data is None:
+        st.warning("Please upload a comments dataset to proceed.")
+        st.stop()
+    comments_version = dataset_version("comments", channel=channel)
+
+# Derived artifacts of the stored comments are kept in the channel cache; an
+# ad-hoc upload must not replace them, so its artifacts are not persisted.
+artifact_dir = None if uploaded_file is not None else cache_dir(channel)
 
 # --- Check for Missing or Invalid Columns ---
 required_cols = {"Sentiment", "Comments", "DateOnly", "Like_Count", "Reply_Count", "user_ID", "VidId"}
-if not all(col in comments_data.columns for col in required_cols):
+if not required_cols <= set(comment_query("source_columns", comments_data, comments_version)):
     st.error("❌ Required columns ('Sentiment', 'Comments', 'DateOnly', 'Like_Count', 'Reply_Count', 'user_ID', 'VidId') are missing from the comments dataset.")
     st.stop()
 
 # --- Create Cleaned Comments Column ---
-comments_data['clean_comment'] = comments_data['Comments'].str.replace(r'[^\w\s]', '', regex=True)  # Remove punctuation
-comments_data['clean_comment'] = comments_data['clean_comment'].str.replace(r'\s+', ' ', regex=True).str.strip()  # Remove extra spaces
+# Stored files are cleaned chunk by chunk where the text is needed (term counts)
+if isinstance(comments_data, pd.DataFrame):
+    comments_data = clean_comments(comments_data)
+
+# Charts of the whole dataset are keyed on the stored file's version, so a cache hit reads nothing;
+# uploads are keyed on their content
+comments_key = comments_data if comments_version is None else comments_version
+
+
+def normalize_sentiment(df, values):
+    # Stored files keep their raw labels ("Positive", " positive"...): merge them like clean_comments does
+    df = df.assign(Sentiment=df['Sentiment'].str.strip().str.lower())
+    return df.groupby([col for col in df.columns if col not in values])[values].sum().reset_index()
+
+# --- Collapse Duplicate Comments ---
+# Copy-paste and spam comments are clustered with MinHash; each cluster is then
+# filtered, searched and counted once, weighted by its size.
+collapse = st.sidebar.checkbox("🧹 Collapse duplicate comments", value=False)
+
+
+# Signatures are hashed in worker processes once there is more than one chunk
+DEDUP_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+@st.cache_data(show_spinner="Detecting duplicate comments...")
+def cluster_comments(df):
+    max_workers = DEDUP_WORKERS if len(df) > DEDUP_CHUNK_SIZE else 1
+    return add_duplicate_clusters(df, column="clean_comment", max_workers=max_workers)
+
+
+if collapse:
+    # Clustering compares the text of every comment, so only this mode loads them all
+    if isinstance(comments_data, pd.DataFrame):
+        clustered = cluster_comments(comments_data)
+    else:
+        # Stored comments: the clusters are kept in the channel cache per file version
+        with st.spinner("Detecting duplicate comments..."):
+            cluster_ids = get_duplicate_clusters(comments_data, cache_dir=artifact_dir, max_workers=DEDUP_WORKERS)
+        all_comments = clean_comments(load_all_data(channel=channel, verbose=False)[3])
+        clustered = add_duplicate_clusters(all_comments, cluster_ids=cluster_ids)
+    comments_view = collapse_duplicates(clustered)
+    view_version = None
+    st.sidebar.caption(f"{len(comments_view):,} unique of {len(clustered):,} comments")
+else:
+    comments_view = comments_data
+    view_version = comments_version
+
+
+def weighted_count(df):
+    # Number of comments a (possibly collapsed) frame stands for
+    return int(df['cluster_size'].sum()) if collapse else len(df)
+
 
 # --- Filter Comments by Sentiment ---
 st.subheader("🔍 View Comments by Sentiment")
 
 try:
-    # Clean the Sentiment column by stripping spaces and converting to lowercase
-    comments_data['Sentiment'] = comments_data['Sentiment'].str.strip().str.lower()
-
     sentiment_option = st.selectbox("Choose Sentiment Type", ["positive", "neutral", "negative"])
 
-    # Filter comments based on sentiment choice
-    filtered_comments = comments_data[comments_data['Sentiment'] == sentiment_option]
+    # Filter comments based on sentiment choice: only the matching rows are read
+    labels = [label for label in comment_query("distinct_values", comments_view, view_version, 'Sentiment')
+              if str(label).strip().lower() == sentiment_option]
+    display_cols = ['Comment_ID', 'Comments', 'Sentiment'] + (['cluster_size'] if collapse else [])
+    filtered_comments = pd.concat(
+        [comment_query("select_rows", comments_view, view_version, columns=display_cols, where={'Sentiment': label})
+         for label in labels],
+        ignore_index=True,
+    ) if labels else pd.DataFrame(columns=display_cols)
+    filtered_comments['Sentiment'] = sentiment_option
 
-    st.write(f"Showing {len(filtered_comments)} **{sentiment_option}** comments:")
+    st.write(f"Showing {weighted_count(filtered_comments)} **{sentiment_option}** comments:")
 
     # Allow users to search comments for keywords
     search_query = st.text_input("Search comments for a keyword")
     if search_query:
         filtered_comments = filtered_comments[filtered_comments['Comments'].str.contains(search_query, case=False, na=False)]
-        st.write(f"Showing {len(filtered_comments)} comments containing '{search_query}':")
+        st.write(f"Showing {weighted_count(filtered_comments)} comments containing '{search_query}':")
     
     # Display the filtered comments
     if len(filtered_comments) > 0:
-        st.dataframe(filtered_comments[['Comment_ID', 'Comments', 'Sentiment']].head(20))
+        st.dataframe(filtered_comments[display_cols].head(20))
     else:
         st.warning("No comments found matching the filter.")
 
@@ -68,20 +160,74 @@ except Exception as e:
 st.subheader("📊 Sentiment Breakdown")
 
 try:
-    sentiment_counts = comments_data['Sentiment'].value_counts().reset_index()
-    sentiment_counts.columns = ['Sentiment', 'Count']
+    if collapse:
+        sentiment_counts = group_aggregate(comments_view, 'Sentiment', ['cluster_size']).rename(columns={'cluster_size': 'Count'})
+    else:
+        sentiment_counts = comment_query("group_aggregate", comments_data, comments_version, 'Sentiment',
+                                         agg="count", count_name='Count')
+    sentiment_counts = normalize_sentiment(sentiment_counts, ['Count'])
     
-    fig = px.pie(sentiment_counts, values='Count', names='Sentiment', title="Sentiment Breakdown", hole=0.4)
+    fig = cached_figure(
+        "sentiment_pie", sentiment_counts,
+        lambda: px.pie(sentiment_counts, values='Count', names='Sentiment', title="Sentiment Breakdown", hole=0.4),
+    )
     st.plotly_chart(fig)
 except Exception as e:
     st.warning(f"⚠️ Could not display sentiment breakdown: {e}")
 
 
+# --- Word Cloud and Top Terms ---
+st.subheader("☁️ Word Cloud & Top Terms")
+
+
+@st.cache_resource(show_spinner="Counting terms...", max_entries=4, ttl=3600)
+def comment_term_counts(source, version, max_ngram, artifact_dir):
+    # Counts are stored per data version; cache_resource skips re-reading them on reruns.
+    # Only a few recent versions are kept in memory, the rest are re-read from disk.
+    return get_term_counts(source, cache_dir=artifact_dir, ngram_range=(1, max_ngram))
+
+
+try:
+    term_col1, term_col2, term_col3 = st.columns(3)
+    with term_col1:
+        term_scope = st.selectbox("Terms from", ["All comments", "Sentiment", "Video"])
+    with term_col2:
+        if term_scope == "Sentiment":
+            term_value = st.selectbox("Sentiment", ["positive", "neutral", "negative"], key="term_sentiment")
+        elif term_scope == "Video":
+            term_value = st.selectbox("Video", comment_query("distinct_values", comments_data, comments_version, 'VidId'),
+                                      key="term_video")
+        else:
+            term_value = None
+    with term_col3:
+        max_ngram = st.selectbox("Terms up to", [1, 2, 3], format_func=lambda n: "single words" if n == 1 else f"{n}-word phrases")
+
+    term_source = comments_data
+    if isinstance(comments_data, pd.DataFrame):
+        term_source = comments_data[['clean_comment', 'Sentiment', 'VidId']]
+    term_counts = comment_term_counts(term_source, comments_version, max_ngram, artifact_dir)
+    term_key = {"Sentiment": "Sentiment", "Video": "VidId"}.get(term_scope)
+
+    top_terms_df = top_terms(term_counts, n=20, key=term_key, value=term_value)
+    if top_terms_df.empty:
+        st.warning("No terms found for this selection.")
+    else:
+        st.image(wordcloud_png(term_counts, cache_dir=artifact_dir, key=term_key, value=term_value), use_container_width=True)
+
+        fig = px.bar(top_terms_df, x="Count", y="Term", orientation="h", title="Top Terms",
+                     color="Count", color_continuous_scale="Viridis")
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+        st.plotly_chart(fig)
+except Exception as e:
+    st.warning(f"⚠️ Could not display word cloud: {e}")
+
 # --- Sentiment Analysis Over Time (Line Chart) ---
 st.subheader("📅 Sentiment Analysis Over Time")
 
 try:
-    sentiment_over_time = comments_data.groupby(['DateOnly', 'Sentiment']).size().reset_index(name='Count')
+    sentiment_over_time = comment_query("group_aggregate", comments_data, comments_version, ['DateOnly', 'Sentiment'],
+                                        agg="count", count_name='Count')
+    sentiment_over_time = normalize_sentiment(sentiment_over_time, ['Count'])
 
     fig = px.line(sentiment_over_time, x="DateOnly", y="Count", color="Sentiment", 
                   title="Sentiment Analysis Over Time", markers=True)
@@ -93,7 +239,12 @@ except Exception as e:
 st.subheader("👍 Total Likes per Comment")
 
 try:
-    fig = px.histogram(comments_data, x="Like_Count", title="Total Likes per Comment", nbins=30)
+    # Histogram of the per-value counts, so the comments themselves are not read
+    fig = cached_figure("like_histogram", comments_key, lambda: px.histogram(
+        comment_query("group_aggregate", comments_data, comments_version, 'Like_Count',
+                      agg="count", count_name='Comments'),
+        x="Like_Count", y="Comments", histfunc="sum", title="Total Likes per Comment", nbins=30,
+    ))
     st.plotly_chart(fig)
 except Exception as e:
     st.warning(f"⚠️ Could not display likes per comment: {e}")
@@ -102,7 +253,11 @@ except Exception as e:
 st.subheader("💬 Reply Count Distribution")
 
 try:
-    fig = px.histogram(comments_data, x="Reply_Count", title="Reply Count Distribution", nbins=30)
+    fig = cached_figure("reply_histogram", comments_key, lambda: px.histogram(
+        comment_query("group_aggregate", comments_data, comments_version, 'Reply_Count',
+                      agg="count", count_name='Comments'),
+        x="Reply_Count", y="Comments", histfunc="sum", title="Reply Count Distribution", nbins=30,
+    ))
     st.plotly_chart(fig)
 except Exception as e:
     st.warning(f"⚠️ Could not display reply count distribution: {e}")
@@ -111,7 +266,7 @@ except Exception as e:
 st.subheader("🏆 Top Comments by Like Count")
 
 try:
-    top_comments = comments_data[['Comments', 'Like_Count']].sort_values(by="Like_Count", ascending=False).head(10)
+    top_comments = comment_query("top_k", comments_view, view_version, "Like_Count", k=10, columns=['Comments', 'Like_Count'])
     fig = px.bar(top_comments, x='Comments', y='Like_Count', title="Top Comments by Like Count", color='Like_Count', 
                  color_continuous_scale="Viridis", labels={'Like_Count': 'Likes'})
     st.plotly_chart(fig)
@@ -122,7 +277,8 @@ except Exception as e:
 st.subheader("📅 Comment Frequency Over Time")
 
 try:
-    comment_frequency = comments_data.groupby(['DateOnly']).size().reset_index(name='Comment Count')
+    comment_frequency = comment_query("group_aggregate", comments_data, comments_version, 'DateOnly',
+                                      agg="count", count_name='Comment Count')
 
     fig = px.line(comment_frequency, x="DateOnly", y="Comment Count", title="Comment Frequency Over Time", markers=True)
     st.plotly_chart(fig)
@@ -135,19 +291,35 @@ except Exception as e:
 st.subheader("👥 User Engagement by User")
 
 try:
-    user_engagement = comments_data.groupby('user_ID')[['Like_Count', 'Reply_Count']].sum().reset_index()
-
-    fig = px.scatter(user_engagement, x="Like_Count", y="Reply_Count", color="user_ID", 
-                     title="User Engagement by User", labels={'Like_Count': 'Likes', 'Reply_Count': 'Replies'})
+    # One trace per user: by far the slowest chart to build, so it is only built once per data version
+    fig = cached_figure("user_engagement", comments_key, lambda: px.scatter(
+        comment_query("group_aggregate", comments_data, comments_version, 'user_ID', ['Like_Count', 'Reply_Count']),
+        x="Like_Count", y="Reply_Count", color="user_ID",
+        title="User Engagement by User", labels={'Like_Count': 'Likes', 'Reply_Count': 'Replies'},
+    ))
     st.plotly_chart(fig)
 except Exception as e:
     st.warning(f"⚠️ Could not display user engagement by user: {e}")
 
+# --- Commenter Segments (Mini-Batch KMeans) ---
+st.subheader("🧩 Commenter Segments")
+
+try:
+    commenters = comment_query("commenter_features", comments_data, comments_version)
+    # Commenter rows change as users comment again: only new or changed users are assigned,
+    # the stored segments are not refitted
+    segmented_commenters = segment_rows(commenters, COMMENTER_FEATURES, cache_dir=artifact_dir, key="user_ID")
+
+    st.dataframe(segment_summary(segmented_commenters, COMMENTER_FEATURES), use_container_width=True)
+except Exception as e:
+    st.warning(f"⚠️ Could not build commenter segments: {e}")
+
 # --- Comment Frequency per Video (Bar Chart) ---
 st.subheader("🎥 Comment Frequency per Video")
 
 try:
-    comment_frequency_per_video = comments_data.groupby('VidId').size().reset_index(name='Comment Count')
+    comment_frequency_per_video = comment_query("group_aggregate", comments_data, comments_version, 'VidId',
+                                                agg="count", count_name='Comment Count')
 
     fig = px.bar(comment_frequency_per_video, x="VidId", y="Comment Count", title="Comment Frequency per Video", color="Comment Count",
                  color_continuous_scale="Viridis")
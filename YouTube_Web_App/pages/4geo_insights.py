@@ -1,10 +1,28 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils.data_utils import load_all_data
+from utils.data_utils import dataset_path, select_channel
+from utils.query_utils import distinct_values, group_aggregate, select_rows, source_columns, top_k
 
 st.title("🌍 Geographic Insights for New YouTubers")
 
+GEO_QUERIES = {
+    "source_columns": source_columns,
+    "distinct_values": distinct_values,
+    "select_rows": select_rows,
+}
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def geo_query(name, source, version, *args, **kwargs):
+    # `version` (mtime and size of a stored file) invalidates results when the file changes;
+    # uploaded frames are hashed by content instead
+    return GEO_QUERIES[name](source, *args, **kwargs)
+
+
+channel = select_channel()
+
 # --- File Uploader for External Data ---
 st.sidebar.subheader("📂 Upload External Data")
 uploaded_file = st.sidebar.file_uploader("Upload Video Data CSV", type="csv")
@@ -19,15 +37,19 @@ if uploaded_file is not None:
         st.stop()
 
 else:
-    # If no file is uploaded, load the existing data
-    try:
-        _, geo_data, _, _ = load_all_data()
-    except Exception as e:
-        st.error(f"❌ Failed to load default video data: {e}")
-        st.stop()
+    # If no file is uploaded, query the stored file lazily instead of loading it
+    geo_data = dataset_path("geo_data", channel=channel)
+
+geo_version = (os.path.getmtime(geo_data), os.path.getsize(geo_data)) if isinstance(geo_data, str) else None
 
 # --- Check for Empty Data ---
-if geo_data.empty:
+try:
+    geo_columns = geo_query("source_columns", geo_data, geo_version) if geo_data is not None else {}
+except Exception as e:
+    st.error(f"❌ Failed to load default video data: {e}")
+    st.stop()
+
+if not geo_columns or (isinstance(geo_data, pd.DataFrame) and geo_data.empty):
     st.warning("No data available.")
     st.stop()
 
@@ -35,23 +57,25 @@ if geo_data.empty:
 required_columns = ['Country Code', 'Is Subscribed', 'Views', 'Video Length', 'Video Title', 'Video Likes Added', 
                     'Video Dislikes Added', 'Video Likes Removed', 'User Subscriptions Added', 'User Subscriptions Removed', 
                     'Average View Percentage', 'Average Watch Time']
-missing_columns = [col for col in required_columns if col not in geo_data.columns]
+missing_columns = [col for col in required_columns if col not in geo_columns]
 if missing_columns:
     st.warning(f"⚠️ Missing columns: {', '.join(missing_columns)}")
 
 # --- Country Selection Widget ---
 st.sidebar.header("🌍 Select a Country")
-countries = geo_data['Country Code'].unique()  # Get unique countries in the dataset
+countries = geo_query("distinct_values", geo_data, geo_version, 'Country Code')  # Get unique countries in the dataset
 
 # Allow the user to select a single country
 selected_country = st.sidebar.selectbox("Choose a country to visualize:", countries)
 
 # --- Filter Data by Selected Country ---
-filtered_data = geo_data[geo_data['Country Code'] == selected_country]
+# The source is scanned once per country; the charts below only query this slice
+country_filter = {'Country Code': selected_country}
+filtered_data = geo_query("select_rows", geo_data, geo_version, where=country_filter)
 
 # --- Metric Selection ---
 st.sidebar.header("🎯 Metric Selection")
-numeric_cols = geo_data.select_dtypes(include='number').columns.tolist()
+numeric_cols = [col for col, is_numeric in geo_columns.items() if is_numeric]
 
 if not numeric_cols:
     st.error("⚠️ No numeric columns found in the dataset.")
@@ -62,7 +86,7 @@ metric = st.sidebar.selectbox("Select a metric to visualize:", numeric_cols, ind
 # --- Top Performing Videos by Views ---
 st.subheader(f"📈 Top Performing Videos by Views (Country: {selected_country})")
 try:
-    top_videos = filtered_data.sort_values(by="Views", ascending=False).head(10)
+    top_videos = top_k(filtered_data, "Views", k=10)
 
     fig_top_videos = px.bar(
         top_videos,
@@ -80,7 +104,8 @@ except Exception as e:
 # --- Likes and Dislikes Breakdown ---
 st.subheader(f"👍 Likes and Dislikes Breakdown (Country: {selected_country})")
 try:
-    engagement_data = filtered_data[['Video Title', 'Video Likes Added', 'Video Dislikes Added']].sort_values(by="Video Likes Added", ascending=False).head(10)
+    engagement_data = top_k(filtered_data, "Video Likes Added", k=10,
+                            columns=['Video Title', 'Video Likes Added', 'Video Dislikes Added'])
 
     fig_engagement = px.bar(
         engagement_data,
@@ -97,7 +122,9 @@ except Exception as e:
 # --- Subscriber Growth ---
 st.subheader(f"📈 Subscriber Growth vs Views (Country: {selected_country})")
 try:
-    filtered_data["Subscriber Growth"] = filtered_data["User Subscriptions Added"] - filtered_data["User Subscriptions Removed"]
+    filtered_data = filtered_data.assign(
+        **{"Subscriber Growth": filtered_data["User Subscriptions Added"] - filtered_data["User Subscriptions Removed"]}
+    )
 
     fig_subscriber_growth = px.scatter(
         filtered_data,
@@ -133,7 +160,7 @@ except Exception as e:
 # --- Views by Video Length ---
 st.subheader(f"🎥 {metric} by Video Length (Country: {selected_country})")
 try:
-    views_by_length = filtered_data.groupby("Video Length")[metric].sum().reset_index()
+    views_by_length = group_aggregate(filtered_data, "Video Length", [metric])
 
     fig_views_by_length = px.bar(
         views_by_length,
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app imports its helpers as `utils.*`, relative to YouTube_Web_App/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def video_data():
+    """
+    Synthetic video table with the columns the dashboard summary and segments use.
+    """
+    rng = np.random.default_rng(0)
+    n = 400
+    published = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 900, n), unit="D")
+    return pd.DataFrame({
+        "Video": [f"v{i}" for i in range(n)],
+        "Video title": [f"Video {i}" for i in range(n)],
+        "Video publish date": published,
+        "Publish Month": published.strftime("%Y-%m"),
+        "Publish Weekday": published.day_name(),
+        "Is Weekend": published.dayofweek >= 5,
+        # Distinct views, so the top-k has no ties
+        "Views": rng.permutation(n) * 100 + 50,
+        "Subscribers gained": rng.integers(0, 500, n),
+        "Your Estmated Revenue (USD)": rng.integers(0, 10_000, n) / 100,
+        "RPM (USD)": rng.integers(50, 800, n) / 100,
+        "Impressions": rng.integers(1_000, 100_000, n),
+        "Impressionss click-through rate (%)": rng.integers(10, 150, n) / 10,
+        "Average Percentage viewed(%)": rng.integers(100, 900, n) / 10,
+        "Average view Duration (sec)": rng.integers(30, 900, n),
+    })
+
+
+@pytest.fixture
+def comments():
+    """
+    Synthetic comments table with the columns the term counts use.
+    """
+    rng = np.random.default_rng(1)
+    words = ["great", "video", "thanks", "love", "data", "science", "tutorial", "python", "helpful", "music"]
+    n = 300
+    return pd.DataFrame({
+        "clean_comment": [" ".join(rng.choice(words, rng.integers(2, 8))) for _ in range(n)],
+        "Sentiment": rng.choice(["Positive", "Neutral", "Negative"], n),
+        "VidId": rng.choice(["a", "b", "c"], n),
+        "DateOnly": (pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D")).date,
+    })
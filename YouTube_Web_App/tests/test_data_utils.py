@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+import pytest
+
+from utils.data_utils import (DATA_FILES, aggregate_channels, channel_data_dir, convert_to_parquet, dataset_path,
+                              list_channels)
+
+
+def write_videos(data_dir, channel, views):
+    channel_dir = channel_data_dir(channel, data_dir)
+    os.makedirs(channel_dir, exist_ok=True)
+    path = os.path.join(channel_dir, DATA_FILES["video_data"])
+    videos = pd.DataFrame({"Views": views, "Subscribers gained": 1, "Format": ["Short", "Long"][:len(views)]})
+    videos.to_csv(path, index=False)
+    return path
+
+
+def test_channel_data_dir(tmp_path):
+    assert channel_data_dir(None, str(tmp_path)) == str(tmp_path)
+    assert channel_data_dir("demo_1", str(tmp_path)) == os.path.join(str(tmp_path), "channels", "demo_1")
+    for channel in ["../demo", "a/b", "demo channel"]:
+        with pytest.raises(ValueError):
+            channel_data_dir(channel, str(tmp_path))
+
+
+def test_list_channels(tmp_path):
+    assert list_channels(str(tmp_path)) == []
+    for channel in ["b", "a"]:
+        os.makedirs(channel_data_dir(channel, str(tmp_path)))
+    # Stray files are not channels
+    open(os.path.join(str(tmp_path), "channels", "notes.txt"), "w").close()
+    assert list_channels(str(tmp_path)) == ["a", "b"]
+
+
+def test_aggregate_channels_sums_each_channel(tmp_path):
+    data_dir = str(tmp_path)
+    write_videos(data_dir, "a", [10, 20])
+    write_videos(data_dir, "b", [5])
+    os.makedirs(channel_data_dir("empty", data_dir))
+
+    totals = aggregate_channels("video_data", ["Views", "Subscribers gained"], data_dir=data_dir)
+    assert totals.to_dict("records") == [
+        {"channel": "a", "Views": 30, "Subscribers gained": 2},
+        {"channel": "b", "Views": 5, "Subscribers gained": 1},
+    ]
+
+    by_format = aggregate_channels("video_data", ["Views"], by=["Format"], data_dir=data_dir)
+    assert by_format.to_dict("records") == [
+        {"channel": "a", "Format": "Long", "Views": 20},
+        {"channel": "a", "Format": "Short", "Views": 10},
+        {"channel": "b", "Format": "Short", "Views": 5},
+    ]
+
+    # Channels missing a column are left out
+    assert aggregate_channels("video_data", ["Impressions"], data_dir=data_dir).empty
+
+
+def test_aggregate_channels_picks_up_new_uploads(tmp_path):
+    data_dir = str(tmp_path)
+    write_videos(data_dir, "a", [10])
+    write_videos(data_dir, "b", [5])
+    assert aggregate_channels("video_data", ["Views"], data_dir=data_dir)["Views"].tolist() == [10, 5]
+
+    write_videos(data_dir, "a", [10, 100])
+    assert aggregate_channels("video_data", ["Views"], data_dir=data_dir)["Views"].tolist() == [110, 5]
+
+
+def test_aggregate_channels_reads_parquet_copies(tmp_path):
+    data_dir = str(tmp_path)
+    csv_path = write_videos(data_dir, "a", [10, 20])
+    write_videos(data_dir, "b", [5])
+    convert_to_parquet("video_data", "a", data_dir)
+    assert dataset_path("video_data", "a", data_dir).endswith(".parquet")
+
+    # A channel with only the Parquet copy still counts
+    os.remove(csv_path)
+    totals = aggregate_channels("video_data", ["Views"], data_dir=data_dir)
+    assert totals.to_dict("records") == [{"channel": "a", "Views": 30}, {"channel": "b", "Views": 5}]
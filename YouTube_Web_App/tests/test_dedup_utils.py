@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from utils.dedup_utils import NUM_PERM, add_duplicate_clusters, assign_duplicate_clusters, collapse_duplicates
+
+TEXTS = [
+    "great video thanks",
+    "great video thanks!",
+    "great tutorial on python",
+    "great music here",
+    "Great video, thanks",
+    "",
+    None,
+]
+
+
+def test_near_duplicates_are_grouped():
+    clusters = assign_duplicate_clusters(TEXTS)
+    assert clusters[0] == clusters[1]
+    assert len(set(clusters[[0, 2, 3, 4]])) == 4
+    # Empty texts are never grouped, not even with each other
+    assert clusters[5] != clusters[6]
+
+
+def test_candidates_are_verified_before_merging():
+    # One row per band makes any shared shingle minimum an LSH candidate
+    assert len(set(assign_duplicate_clusters(TEXTS[:5], bands=NUM_PERM, threshold=0.0))) == 1
+    clusters = assign_duplicate_clusters(TEXTS[:5], bands=NUM_PERM)
+    np.testing.assert_array_equal(clusters, assign_duplicate_clusters(TEXTS[:5]))
+
+
+def test_chunks_and_workers_do_not_change_clusters():
+    rng = np.random.default_rng(0)
+    base = [f"comment number {i} about topic {i % 7}" for i in range(60)]
+    texts = [base[i] if rng.random() < 0.5 else base[i] + "!" for i in rng.integers(0, 60, 400)]
+
+    expected = assign_duplicate_clusters(texts)
+    np.testing.assert_array_equal(assign_duplicate_clusters(texts, chunk_size=37), expected)
+    np.testing.assert_array_equal(assign_duplicate_clusters(texts, chunk_size=37, max_workers=2), expected)
+
+
+def test_collapse_keeps_one_row_per_cluster():
+    df = add_duplicate_clusters(pd.DataFrame({"clean_comment": TEXTS[:5]}))
+    assert df["cluster_size"].tolist() == [2, 2, 1, 1, 1]
+    assert len(collapse_duplicates(df)) == 4
+
+
+def test_candidates_are_checked_against_every_bucket_cluster(monkeypatch):
+    # Crafted signatures: "a" and "b" agree on bands 0-6 (56/64 values), and
+    # each decoy matches "a" on a single band only. The decoys come first, so
+    # they occupy every bucket "a" and "b" share.
+    rows = NUM_PERM // 8
+    a = np.arange(NUM_PERM, dtype=np.uint32)
+    b = a.copy()
+    b[7 * rows:] += 1000
+    signatures = {"a": a, "b": b}
+    for band in range(7):
+        decoy = np.arange(NUM_PERM, dtype=np.uint32) + 2000 * (band + 1)
+        decoy[band * rows:(band + 1) * rows] = a[band * rows:(band + 1) * rows]
+        signatures[f"decoy {band}"] = decoy
+    monkeypatch.setattr("utils.dedup_utils.minhash_signatures",
+                        lambda texts: np.array([signatures[text] for text in texts]))
+
+    texts = [f"decoy {band}" for band in range(7)] + ["a", "b"]
+    clusters = assign_duplicate_clusters(texts, bands=8)
+    assert clusters[-1] == clusters[-2]
+    assert len(set(clusters)) == 8
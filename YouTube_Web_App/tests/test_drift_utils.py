@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.drift_utils import (PSI_ALERT, PSI_WARN, build_drift_monitor, clear_scored_batches, drift_report,
+                               get_drift_monitor, record_scored_batch, update_drift_monitor)
+
+
+@pytest.fixture
+def reference():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"Views": rng.normal(1_000, 200, 5_000), "Likes": rng.exponential(50, 5_000)})
+
+
+def batch(seed, shift=0.0, n=1_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Views": rng.normal(1_000 + shift, 200, n), "Likes": rng.exponential(50, n)})
+
+
+def test_merged_moments_match_all_scored_rows(reference):
+    monitor = build_drift_monitor(reference)
+    batches = [batch(seed, n=n) for seed, n in [(1, 10), (2, 1_000), (3, 1)]]
+    batches[1].loc[:5, "Views"] = np.nan
+    for scored in batches:
+        update_drift_monitor(monitor, scored)
+
+    scored = pd.concat(batches, ignore_index=True)
+    report = drift_report(monitor).set_index("Feature")
+    for column in reference.columns:
+        current = monitor["features"][column]["current"]
+        assert current["n"] == scored[column].notna().sum()
+        assert current["missing"] == scored[column].isna().sum()
+        assert sum(current["counts"]) == current["n"]
+        assert current["mean"] == pytest.approx(scored[column].mean())
+        assert report.loc[column, "Current Std"] == pytest.approx(scored[column].std())
+        assert (current["min"], current["max"]) == (scored[column].min(), scored[column].max())
+
+
+def test_psi_flags_a_shift(reference):
+    monitor = build_drift_monitor(reference)
+    stable = update_drift_monitor(monitor, batch(1))["history"][-1]["psi"]
+    shifted = update_drift_monitor(monitor, batch(2, shift=400))["history"][-1]["psi"]
+
+    assert stable["Views"] < PSI_WARN
+    assert shifted["Views"] > PSI_ALERT
+    assert shifted["Likes"] < PSI_WARN
+
+
+def test_recorded_batches_are_counted_once(reference, tmp_path):
+    cache_dir = str(tmp_path)
+    scored = batch(1)
+    record_scored_batch(reference, scored, cache_dir)
+    record_scored_batch(reference, scored, cache_dir)
+    record_scored_batch(reference, batch(2), cache_dir)
+
+    monitor = get_drift_monitor(reference, cache_dir)
+    assert len(monitor["history"]) == 2
+    assert monitor["features"]["Views"]["current"]["n"] == 2 * len(scored)
+
+    clear_scored_batches(reference, cache_dir)
+    monitor = get_drift_monitor(reference, cache_dir)
+    assert monitor["history"] == []
+    assert monitor["features"]["Views"]["current"]["n"] == 0
+    assert monitor["features"]["Views"]["reference"]["n"] == len(reference)
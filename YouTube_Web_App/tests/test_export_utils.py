@@ -0,0 +1,65 @@
+import json
+import os
+import pandas as pd
+import pytest
+
+from utils.export_utils import MANIFEST_FILE, export_dir, export_extract, load_manifest
+
+
+@pytest.fixture
+def extract_dir(tmp_path):
+    return str(tmp_path / "extract")
+
+
+def test_unchanged_partitions_are_skipped(video_data, extract_dir):
+    first = export_extract({"video_data": video_data}, extract_dir).iloc[0]
+    assert first["Written"] == first["Partitions"] > 1
+
+    second = export_extract({"video_data": video_data}, extract_dir).iloc[0]
+    assert second["Written"] == 0
+    assert second["Unchanged"] == first["Partitions"]
+    assert second["Bytes Written"] == 0
+
+
+def test_changed_and_removed_partitions(video_data, extract_dir):
+    export_extract({"video_data": video_data}, extract_dir)
+    months = pd.to_datetime(video_data["Video publish date"]).dt.strftime("%Y-%m")
+    first_month, last_month = months.min(), months.max()
+
+    changed = video_data[months != first_month].copy()
+    changed.loc[months == last_month, "Views"] += 1
+    stats = export_extract({"video_data": changed}, extract_dir).iloc[0]
+
+    assert (stats["Written"], stats["Removed"]) == (1, 1)
+    partitions = load_manifest(extract_dir)["tables"]["video_data"]["partitions"]
+    assert first_month not in partitions
+    assert not os.path.exists(os.path.join(extract_dir, "video_data", f"video_data_{first_month}.parquet"))
+    exported = pd.read_parquet(os.path.join(extract_dir, partitions[last_month]["file"]))
+    assert exported["Views"].sum() == changed.loc[months == last_month, "Views"].sum()
+
+
+def test_manifest_paths_outside_the_table_are_ignored(video_data, extract_dir, tmp_path):
+    victim = tmp_path / "victim.txt"
+    victim.write_text("keep")
+    export_extract({"video_data": video_data}, extract_dir)
+
+    manifest_path = os.path.join(extract_dir, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["tables"]["video_data"]["partitions"]["stale"] = {"file": "../victim.txt", "hash": "", "rows": 1}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    export_extract({"video_data": video_data}, extract_dir)
+    assert victim.read_text() == "keep"
+
+
+@pytest.mark.parametrize("name", ["", "..", "../other", "a/b", "channels"])
+def test_export_dir_rejects_unsafe_names(name):
+    with pytest.raises(ValueError):
+        export_dir("demo", name)
+
+
+def test_export_dir_uses_the_export_root(monkeypatch, tmp_path):
+    monkeypatch.setenv("POWERBI_EXPORT_ROOT", str(tmp_path))
+    assert export_dir("demo").startswith(str(tmp_path))
@@ -0,0 +1,88 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.figure_utils import FigureCache, figure_key
+
+
+def bar(n):
+    return go.Figure(go.Bar(x=list(range(n)), y=list(range(n))))
+
+
+def counting(build):
+    calls = []
+
+    def wrapped():
+        calls.append(1)
+        return build()
+    return wrapped, calls
+
+
+def test_hit_returns_a_copy_without_rebuilding():
+    cache = FigureCache()
+    build, calls = counting(lambda: bar(3))
+
+    first = cache.get("a", build)
+    first.update_layout(title="changed")
+    second = cache.get("a", build)
+
+    assert len(calls) == 1
+    assert second.layout.title.text is None
+    assert list(second.data[0].x) == [0, 1, 2]
+
+
+def test_least_recently_used_figure_is_evicted_over_budget():
+    size = len(bar(50).to_json())
+    cache = FigureCache(max_bytes=int(size * 2.5))
+    cache.get("a", lambda: bar(50))
+    cache.get("b", lambda: bar(50))
+    cache.get("a", lambda: bar(50))  # "b" is now the least recently used
+    cache.get("c", lambda: bar(50))
+
+    build, calls = counting(lambda: bar(50))
+    cache.get("a", build)
+    cache.get("c", build)
+    assert not calls
+    cache.get("b", build)
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["entries"] == 2
+
+
+def test_figure_over_the_whole_budget_is_not_stored():
+    cache = FigureCache(max_bytes=len(bar(5).to_json()))
+    cache.get("small", lambda: bar(5))
+    cache.get("large", lambda: bar(500))
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["evictions"] == 0
+    assert stats["bytes"] == len(bar(5).to_json())
+
+
+def test_stats_and_clear():
+    cache = FigureCache()
+    cache.get("a", lambda: bar(3))
+    cache.get("a", lambda: bar(3))
+    cache.get("a", lambda: bar(3))
+    cache.get("b", lambda: bar(3))
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert stats["build_seconds"] > 0
+    assert stats["saved_seconds"] > 0
+
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (0, 0, 0, 0)
+    assert stats["hit_rate"] == 0.0
+    assert stats["build_seconds"] == 0.0
+
+
+def test_figure_key_uses_data_and_params():
+    df = pd.DataFrame({"x": [1, 2]})
+    assert figure_key("chart", df, a=1, b=2) == figure_key("chart", df.copy(), b=2, a=1)
+    assert figure_key("chart", df) != figure_key("chart", df.assign(x=[1, 3]))
+    assert figure_key("chart", ("path", 1, 2)) != figure_key("chart", ("path", 1, 3))
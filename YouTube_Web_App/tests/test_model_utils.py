@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.model_utils import build_whatif_grid
+
+
+@pytest.fixture
+def base_row():
+    return pd.DataFrame({"Impressions": [1000], "Duration": [120.0], "Likes": [50]}, index=[7])
+
+
+def test_grid_is_the_cartesian_product_in_order(base_row):
+    grid = build_whatif_grid(base_row, {"Impressions": [10, 20, 30], "Duration": [60.0, 90.0]})
+
+    assert grid.shape == (6, 3)
+    assert list(grid.index) == list(range(6))
+    assert list(zip(grid["Impressions"], grid["Duration"])) == [
+        (10, 60.0), (10, 90.0), (20, 60.0), (20, 90.0), (30, 60.0), (30, 90.0),
+    ]
+    # Features that are not swept keep the base value
+    assert (grid["Likes"] == 50).all()
+
+
+def test_single_feature_sweep(base_row):
+    grid = build_whatif_grid(base_row, {"Duration": [30.0, 60.0]})
+    assert grid["Duration"].tolist() == [30.0, 60.0]
+    assert (grid["Impressions"] == 1000).all()
+
+
+def test_integer_features_keep_their_dtype(base_row):
+    grid = build_whatif_grid(base_row, {"Impressions": np.linspace(0, 100, 4), "Duration": [1.5]})
+
+    assert grid["Impressions"].dtype == base_row["Impressions"].dtype
+    assert grid["Impressions"].tolist() == [0, 33, 67, 100]
+    assert grid["Duration"].dtype == np.float64
+    assert grid.dtypes.equals(base_row.dtypes)
+
+
+@pytest.mark.parametrize("sweeps, message", [
+    ({}, "one or two features"),
+    ({"Impressions": [1], "Duration": [1.0], "Likes": [1]}, "one or two features"),
+    ({"Subscribers": [1, 2]}, "Missing features"),
+])
+def test_invalid_sweeps(base_row, sweeps, message):
+    with pytest.raises(ValueError, match=message):
+        build_whatif_grid(base_row, sweeps)
+
+
+def test_base_must_be_a_single_row(base_row):
+    with pytest.raises(ValueError, match="exactly one row"):
+        build_whatif_grid(pd.concat([base_row, base_row]), {"Duration": [1.0]})
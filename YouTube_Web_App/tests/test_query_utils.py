@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.query_utils as query_utils
+from utils.query_utils import distinct_values, group_aggregate, select_rows, top_k
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        "Sentiment": ["Positive", None, "Positive", "Negative", "Neutral", None, "Negative", "Positive"],
+        "VidId": ["a", "a", "b", "b", "c", "c", "a", None],
+        "Likes": [3, 1, np.nan, 7, 2, 5, 4, 9],
+        "Views": [100, 50, 75, 300, np.nan, 20, 10, 60],
+    })
+
+
+@pytest.fixture(params=["frame", "csv", "parquet"])
+def source(request, table, tmp_path):
+    if request.param == "frame":
+        return table
+    path = str(tmp_path / f"comments.{request.param}")
+    table.to_csv(path, index=False) if request.param == "csv" else table.to_parquet(path, index=False)
+    return path
+
+
+def both_backends(monkeypatch, query):
+    """
+    Result of `query` with DuckDB and with the pandas fallback.
+    """
+    with_duckdb = query()
+    monkeypatch.setattr(query_utils, "duckdb", None)
+    return with_duckdb, query()
+
+
+def assert_same(left, right):
+    pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize("by", ["Sentiment", ["Sentiment", "VidId"]])
+def test_group_aggregate_backends_agree(monkeypatch, table, source, by):
+    duck, fallback = both_backends(monkeypatch, lambda: group_aggregate(source, by, ["Likes", "Views"]))
+    assert_same(duck, fallback)
+    # Missing group values are left out and all-missing sums are 0, as in pandas groupby
+    assert_same(duck, table.groupby(by)[["Likes", "Views"]].sum().reset_index())
+
+
+def test_group_counts_backends_agree(monkeypatch, source):
+    duck, fallback = both_backends(
+        monkeypatch, lambda: group_aggregate(source, "Sentiment", agg="count", where={"VidId": "a"})
+    )
+    assert_same(duck, fallback)
+    assert duck.to_dict("records") == [{"Sentiment": "Negative", "Count": 1}, {"Sentiment": "Positive", "Count": 1}]
+
+
+def test_top_k_backends_agree(monkeypatch, source):
+    duck, fallback = both_backends(monkeypatch, lambda: top_k(source, "Views", k=3, columns=["VidId", "Views"]))
+    assert_same(duck, fallback)
+    assert duck["Views"].tolist() == [300, 100, 75]
+
+
+def test_distinct_and_select_backends_agree(monkeypatch, source):
+    duck, fallback = both_backends(monkeypatch, lambda: (
+        distinct_values(source, "Sentiment"),
+        select_rows(source, columns=["Sentiment", "Likes"], where={"VidId": "b"}),
+    ))
+    assert duck[0] == fallback[0] == ["Negative", "Neutral", "Positive"]
+    assert_same(duck[1], fallback[1])
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from utils.segment_utils import COMMENTER_FEATURES, N_SEGMENTS, SEGMENT_COLUMNS, commenter_features, get_segments, segment_rows
+
+
+def test_appended_rows_reuse_the_segmenter(video_data, tmp_path):
+    cache_dir = str(tmp_path)
+    first = get_segments(video_data.iloc[:300], cache_dir=cache_dir)
+    extended = get_segments(video_data, cache_dir=cache_dir)
+
+    assert extended["fitted_rows"] == 300
+    np.testing.assert_array_equal(
+        extended["segmenter"]["kmeans"].cluster_centers_, first["segmenter"]["kmeans"].cluster_centers_,
+    )
+    pd.testing.assert_frame_equal(extended["assignments"].iloc[:300], first["assignments"])
+    assert len(extended["assignments"]) == len(video_data)
+
+
+def test_refit_uses_all_rows(video_data, tmp_path):
+    cache_dir = str(tmp_path)
+    get_segments(video_data.iloc[:300], cache_dir=cache_dir)
+    assert get_segments(video_data, cache_dir=cache_dir, refit=True)["fitted_rows"] == len(video_data)
+
+
+def test_keyed_rows_assign_only_changed_keys(tmp_path):
+    cache_dir = str(tmp_path)
+    rng = np.random.default_rng(0)
+    commenters = pd.DataFrame(rng.integers(1, 50, size=(200, 4)), columns=COMMENTER_FEATURES)
+    commenters.insert(0, "user_ID", [f"u{i:03d}" for i in range(200)])
+    first = get_segments(commenters, COMMENTER_FEATURES, cache_dir=cache_dir, key="user_ID")
+
+    # One user comments again, a new user appears and the rows come back in another order
+    updated = pd.concat([commenters, commenters.iloc[[0]].assign(user_ID="u200")], ignore_index=True)
+    updated.loc[5, "Comments"] += 100
+    updated = updated.sort_values("Comments", kind="stable", ignore_index=True)
+    second = get_segments(updated, COMMENTER_FEATURES, cache_dir=cache_dir, key="user_ID")
+
+    assert second["fitted_rows"] == 200
+    np.testing.assert_array_equal(
+        second["segmenter"]["kmeans"].cluster_centers_, first["segmenter"]["kmeans"].cluster_centers_,
+    )
+    before = pd.concat([commenters["user_ID"], first["assignments"]], axis=1).set_index("user_ID")
+    after = pd.concat([updated["user_ID"], second["assignments"]], axis=1).set_index("user_ID")
+    unchanged = before.index.drop("u005")
+    pd.testing.assert_frame_equal(after.loc[unchanged], before.loc[unchanged])
+    assert after.loc[["u005", "u200"], "Segment"].between(0, N_SEGMENTS - 1).all()
+    assert len(second["assignments"]) == len(updated)
+
+    refitted = get_segments(updated, COMMENTER_FEATURES, cache_dir=cache_dir, refit=True, key="user_ID")
+    assert refitted["fitted_rows"] == len(updated)
+
+
+def test_segment_rows_adds_assignments(video_data):
+    segmented = segment_rows(video_data)
+    assert list(segmented.columns) == [*video_data.columns, *SEGMENT_COLUMNS]
+    assert segmented["Segment"].between(0, N_SEGMENTS - 1).all()
+
+
+def test_commenter_features_from_frame_and_file(tmp_path):
+    comments = pd.DataFrame({
+        "user_ID": ["u2", "u1", "u2", "u1", None, "u3"],
+        "VidId": ["a", "a", "b", "a", "a", None],
+        "Like_Count": [1, 2, 3, 4, 5, 6],
+        "Reply_Count": [0, 1, 0, 1, 0, 1],
+    })
+    expected = pd.DataFrame({
+        "user_ID": ["u1", "u2", "u3"],
+        "Comments": [2, 2, 1],
+        "Likes": [6, 4, 6],
+        "Replies": [2, 0, 1],
+        "Videos": [1, 2, 0],
+    })
+    path = str(tmp_path / "comments.parquet")
+    comments.to_parquet(path, index=False)
+
+    for source in [comments, path]:
+        pd.testing.assert_frame_equal(commenter_features(source), expected, check_dtype=False)
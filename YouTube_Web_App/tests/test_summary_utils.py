@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from utils.summary_utils import (PROJECTION_POINTS, PROJECTIONS, ROLLUPS, build_dashboard_summary,
+                                 get_dashboard_summary, update_dashboard_summary)
+
+
+def assert_same_summary(summary, expected):
+    pd.testing.assert_frame_equal(summary["top_videos"], expected["top_videos"], check_dtype=False)
+    for name, by in ROLLUPS.items():
+        pd.testing.assert_frame_equal(
+            summary[name].sort_values(by).reset_index(drop=True),
+            expected[name].sort_values(by).reset_index(drop=True),
+            check_dtype=False,
+        )
+    for name in PROJECTIONS:
+        pd.testing.assert_frame_equal(summary[name], expected[name], check_dtype=False)
+
+
+@pytest.mark.parametrize("n_old", [0, 1, 150, 399])
+def test_update_matches_full_build(video_data, n_old):
+    old = {**build_dashboard_summary(video_data.iloc[:n_old]), "n_rows": n_old}
+    assert_same_summary(update_dashboard_summary(old, video_data), build_dashboard_summary(video_data))
+
+
+def test_projection_sample_matches_full_build(video_data):
+    # More rows than the sample keeps, so merging the samples has to drop rows
+    video_data = pd.concat(
+        [video_data.assign(Views=video_data["Views"] + i) for i in range(PROJECTION_POINTS // len(video_data) + 2)],
+        ignore_index=True,
+    )
+    old = {**build_dashboard_summary(video_data.iloc[:3_000]), "n_rows": 3_000}
+    updated = update_dashboard_summary(old, video_data)
+    expected = build_dashboard_summary(video_data)
+    for name in PROJECTIONS:
+        assert len(updated[name]) == PROJECTION_POINTS
+        pd.testing.assert_frame_equal(updated[name], expected[name], check_dtype=False)
+
+
+def test_stored_summary_is_extended(video_data, tmp_path):
+    get_dashboard_summary(video_data.iloc[:250], cache_dir=str(tmp_path))
+    extended = get_dashboard_summary(video_data, cache_dir=str(tmp_path))
+    assert extended["n_rows"] == len(video_data)
+    assert_same_summary(extended, get_dashboard_summary(video_data))
+
+
+def test_file_source_matches_frame(video_data, tmp_path):
+    path = tmp_path / "Processed_Video_Data.csv"
+    video_data.to_csv(path, index=False)
+    from_file = build_dashboard_summary(str(path))
+    from_frame = build_dashboard_summary(pd.read_csv(path))
+    assert_same_summary(from_file, from_frame)
@@ -0,0 +1,54 @@
+import os
+
+from utils.text_utils import build_term_counts, clean_comments, get_term_counts
+
+
+def test_term_counts_extend_matches_full_build(comments, tmp_path):
+    get_term_counts(comments.iloc[:180], cache_dir=str(tmp_path), ngram_range=(1, 2))
+    extended = get_term_counts(comments, cache_dir=str(tmp_path), ngram_range=(1, 2))
+    full = get_term_counts(comments, ngram_range=(1, 2))
+
+    assert extended["n_rows"] == len(comments)
+    assert extended["all"] == full["all"]
+    assert extended["by"] == full["by"]
+
+
+def test_stored_counts_are_not_shared_between_ngram_ranges(comments, tmp_path):
+    unigrams = get_term_counts(comments, cache_dir=str(tmp_path))
+    bigrams = get_term_counts(comments, cache_dir=str(tmp_path), ngram_range=(2, 2))
+    assert all(" " not in term for term in unigrams["all"])
+    assert all(" " in term for term in bigrams["all"])
+
+
+def test_chunked_counts_match_single_pass(comments):
+    single = build_term_counts(comments, keys=("Sentiment",), chunk_size=len(comments))
+    chunked = build_term_counts(comments, keys=("Sentiment",), chunk_size=7)
+    assert chunked == single
+
+
+def test_file_counts_match_cleaned_frame(comments, tmp_path):
+    # Stored files hold the raw text and labels; they are cleaned chunk by chunk
+    raw = comments.assign(Comments=comments["clean_comment"].str.upper() + "!", Sentiment=" " + comments["Sentiment"])
+    path = str(tmp_path / "comments.csv")
+    raw.drop(columns="clean_comment").to_csv(path, index=False)
+
+    from_file = get_term_counts(path, ngram_range=(1, 2))
+    from_frame = get_term_counts(clean_comments(raw), ngram_range=(1, 2))
+    assert from_file["all"] == from_frame["all"]
+    assert from_file["by"] == from_frame["by"]
+
+
+def test_file_counts_are_stored_per_file_version(comments, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    path = str(tmp_path / "comments.csv")
+    comments.rename(columns={"clean_comment": "Comments"}).to_csv(path, index=False)
+
+    first = get_term_counts(path, cache_dir=cache_dir)
+    assert get_term_counts(path, cache_dir=cache_dir)["fingerprint"] == first["fingerprint"]
+
+    comments.iloc[:10].rename(columns={"clean_comment": "Comments"}).to_csv(path, index=False)
+    os.utime(path, ns=(0, 0))
+    second = get_term_counts(path, cache_dir=cache_dir)
+    assert second["fingerprint"] != first["fingerprint"]
+    assert sum(second["all"].values()) < sum(first["all"].values())
+    assert len(os.listdir(os.path.join(cache_dir, "term_counts_1_1_file"))) == 1
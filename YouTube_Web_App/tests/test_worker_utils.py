@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from utils import worker_utils
+from utils.worker_utils import has_active_jobs, list_jobs, submit_job
+
+
+@pytest.fixture(autouse=True)
+def empty_jobs(monkeypatch):
+    monkeypatch.setattr(worker_utils, "_jobs", {})
+
+
+def job(job_id):
+    return next(job for job in list_jobs() if job["id"] == job_id)
+
+
+def wait(job_id, timeout=10):
+    deadline = time.time() + timeout
+    while job(job_id)["status"] in ("queued", "running"):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return job(job_id)
+
+
+def test_steps_run_in_order_with_progress():
+    seen = []
+
+    def step(label):
+        def run():
+            current = next(job for job in list_jobs() if job["status"] == "running")
+            seen.append((label, current["message"], current["progress"]))
+        return run
+
+    job_id = submit_job("test", [(label, step(label)) for label in ["a", "b", "c", "d"]])
+    finished = wait(job_id)
+
+    assert seen == [("a", "a", 0.0), ("b", "b", 0.25), ("c", "c", 0.5), ("d", "d", 0.75)]
+    assert finished["status"] == "done"
+    assert finished["progress"] == 1.0
+    assert finished["started"] <= finished["finished"]
+    assert finished["error"] is None
+
+
+def test_jobs_wait_for_the_worker():
+    release = threading.Event()
+    first = submit_job("first", [("block", lambda: release.wait(10))])
+    second = submit_job("second", [("run", lambda: None)])
+
+    while job(first)["status"] == "queued":
+        time.sleep(0.01)
+    assert job(first)["status"] == "running"
+    assert job(second)["status"] == "queued"
+    assert job(second)["message"] == "Waiting for worker"
+    assert has_active_jobs()
+
+    release.set()
+    assert wait(second)["status"] == "done"
+    assert job(first)["status"] == "done"
+    assert not has_active_jobs()
+
+
+def test_job_stops_at_the_first_failing_step():
+    calls = []
+
+    def fail():
+        raise ValueError("broken")
+
+    job_id = submit_job("test", [
+        ("first", lambda: calls.append("first")),
+        ("second", fail),
+        ("third", lambda: calls.append("third")),
+    ])
+    finished = wait(job_id)
+
+    assert calls == ["first"]
+    assert finished["status"] == "failed"
+    assert finished["message"] == "second failed: broken"
+    assert finished["progress"] == 1 / 3
+    assert "ValueError: broken" in finished["error"]
+
+
+def test_history_drops_the_oldest_finished_jobs(monkeypatch):
+    monkeypatch.setattr(worker_utils, "MAX_JOB_HISTORY", 3)
+    job_ids = []
+    for _ in range(5):
+        job_ids.append(submit_job("test", []))
+        wait(job_ids[-1])
+
+    # Each submission trims the finished jobs beyond the limit, keeping the newest
+    assert [job["id"] for job in list_jobs()] == job_ids[:-4:-1]
+
+    # Active jobs are never dropped
+    worker_utils._jobs[job_ids[-1]]["status"] = "running"
+    job_ids.append(submit_job("test", []))
+    wait(job_ids[-1])
+    assert job_ids[-2] in {job["id"] for job in list_jobs()}
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import pandas as pd
+
+from utils.data_utils import frame_fingerprint
+
+LATEST_FILE = "latest.txt"
+
+
+def _load_pickle(path):
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def _tmp_path(path):
+    # Unique per process and thread, so concurrent writers never share a temp file
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def write_atomic(path, write):
+    """
+    Write a file via a temp file and rename, so readers never see a partial file.
+
+    Args:
+        path: Destination path.
+        write: Function tmp_path -> None that writes the full content to tmp_path.
+    """
+    tmp_path = _tmp_path(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_text_atomic(path, text):
+    """
+    Write `text` to `path` atomically (see write_atomic).
+    """
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            f.write(text)
+    write_atomic(path, write)
+
+
+def write_bytes_atomic(path, data):
+    """
+    Write `data` bytes to `path` atomically (see write_atomic).
+    """
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    write_atomic(path, write)
+
+
+def write_pickle_atomic(path, obj):
+    """
+    Pickle `obj` to `path` atomically (see write_atomic).
+    """
+    write_atomic(path, lambda tmp_path: pd.to_pickle(obj, tmp_path))
+
+
+def get_versioned_artifact(df, cache_dir, name, build, extend=None, rebuild=False, update=None):
+    """
+    Return an artifact derived from `df`, stored once per data version.
+
+    Artifacts are stored under <cache_dir>/<name>/<fingerprint>.pkl, and must be
+    dicts. If the data only gained rows since the last stored version and
+    `extend` is given, that version is extended with the new rows instead of
+    being rebuilt; otherwise `update`, if given, derives the new version from
+    the last one. Only the latest version is kept.
+
+    Args:
+        df: DataFrame the artifact is derived from.
+        cache_dir: Cache directory, or None to skip persistence.
+        name: Subdirectory of the artifact.
+        build: Function df -> artifact dict.
+        extend: Optional function (artifact, df) -> artifact of df, given the
+            artifact of the first artifact["n_rows"] rows of df.
+        rebuild: Build from scratch even if a stored version could be reused.
+        update: Optional function (artifact, df) -> artifact of df, given the
+            artifact of any earlier version of the data (e.g. for rows that
+            change in place, matched on a key).
+
+    Returns:
+        Artifact dict, with "fingerprint" and "n_rows" keys set.
+    """
+    fingerprint = frame_fingerprint(df)
+    if cache_dir is None:
+        return {**build(df), "fingerprint": fingerprint, "n_rows": len(df)}
+
+    artifact_dir = os.path.join(cache_dir, name)
+    path = os.path.join(artifact_dir, f"{fingerprint}.pkl")
+
+    if os.path.exists(path) and not rebuild:
+        artifact = _load_pickle(path)
+        if artifact is not None:
+            return artifact
+
+    # Try to extend the most recent version when rows were only appended, or to update it
+    artifact = None
+    latest_path = os.path.join(artifact_dir, LATEST_FILE)
+    if (extend is not None or update is not None) and not rebuild and os.path.exists(latest_path):
+        with open(latest_path) as f:
+            latest = _load_pickle(os.path.join(artifact_dir, f"{f.read().strip()}.pkl"))
+        if latest is None:
+            pass
+        elif (extend is not None and latest["n_rows"] < len(df)
+                and frame_fingerprint(df.iloc[:latest["n_rows"]]) == latest["fingerprint"]):
+            artifact = extend(latest, df)
+        elif update is not None:
+            artifact = update(latest, df)
+
+    if artifact is None:
+        artifact = build(df)
+    artifact = {**artifact, "fingerprint": fingerprint, "n_rows": len(df)}
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    write_pickle_atomic(path, artifact)
+    write_text_atomic(latest_path, fingerprint)
+
+    # Only the latest version is ever extended, so older ones can go
+    _remove_other_versions(artifact_dir, fingerprint)
+    return artifact
+
+
+def _remove_other_versions(artifact_dir, fingerprint):
+    for file_name in os.listdir(artifact_dir):
+        if file_name.endswith(".pkl") and file_name != f"{fingerprint}.pkl":
+            try:
+                os.remove(os.path.join(artifact_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+
+def file_fingerprint(path):
+    """
+    Version hash of a data file from its path, size and modification time, without reading it.
+    """
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def get_file_artifact(path, cache_dir, name, build):
+    """
+    Return an artifact derived from a stored data file, built once per file version.
+
+    Unlike get_versioned_artifact, the file is never loaded to find its
+    version, so `build` can stream it. Artifacts are stored under
+    <cache_dir>/<name>/<file fingerprint>.pkl; only the latest version is kept.
+
+    Args:
+        path: Data file (CSV or Parquet).
+        cache_dir: Cache directory, or None to skip persistence.
+        name: Subdirectory of the artifact.
+        build: Function path -> artifact dict.
+
+    Returns:
+        Artifact dict, with the "fingerprint" key set to file_fingerprint(path).
+    """
+    fingerprint = file_fingerprint(path)
+    if cache_dir is None:
+        return {**build(path), "fingerprint": fingerprint}
+
+    artifact_dir = os.path.join(cache_dir, name)
+    artifact_path = os.path.join(artifact_dir, f"{fingerprint}.pkl")
+    if os.path.exists(artifact_path):
+        artifact = _load_pickle(artifact_path)
+        if artifact is not None:
+            return artifact
+
+    artifact = {**build(path), "fingerprint": fingerprint}
+    os.makedirs(artifact_dir, exist_ok=True)
+    write_pickle_atomic(artifact_path, artifact)
+    _remove_other_versions(artifact_dir, fingerprint)
+    return artifact
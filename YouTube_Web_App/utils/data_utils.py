@@ -1,76 +1,347 @@
 import pandas as pd
+import hashlib
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
+from utils.query_utils import group_aggregate, iter_chunks, source_columns
+
+# Dataset keys mapped to the file each one is stored in
+DATA_FILES = {
+    "video_data": "Processed_Video_Data.csv",
+    "geo_data": "Aggregated_Metrics_By_Country_And_Subscriber_Status.csv",
+    "daily_views": "Daily_Views_Over_Time.csv",
+    "comments": "Processed_Comments_Sentiment.csv"
+}
+
+# Per-channel datasets live under data/channels/<channel>/
+CHANNELS_DIR = "channels"
+
+# Derived artifacts (summaries, indexes, ...) live under <channel dir>/.cache/
+CACHE_DIR = ".cache"
+
+# Parquet metadata key recording the size and mtime of the CSV a copy was made from
+PARQUET_SOURCE_KEY = b"source_csv"
+
+
+def channel_data_dir(channel=None, data_dir="data"):
+    """
+    Resolve the directory holding the datasets of a channel.
+
+    Args:
+        channel: Channel key, or None for the shared top-level data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        Path to the channel's data directory.
+    """
+    if not channel:
+        return data_dir
+
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", channel):
+        raise ValueError(f"❌ Invalid channel key: {channel!r} (use letters, digits, '-' or '_')")
+
+    return os.path.join(data_dir, CHANNELS_DIR, channel)
+
+
+def cache_dir(channel=None, data_dir="data"):
+    """
+    Directory for derived artifacts of a channel's datasets.
+
+    Args:
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        Path to the channel's cache directory (not created).
+    """
+    return os.path.join(channel_data_dir(channel, data_dir), CACHE_DIR)
+
+
+def frame_fingerprint(df):
+    """
+    Content hash of a DataFrame, used to key caches by data version.
+
+    Args:
+        df: DataFrame to hash.
+
+    Returns:
+        Short hex digest that changes whenever the columns or values change.
+    """
+    digest = hashlib.sha1()
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def list_channels(data_dir="data"):
+    """
+    List the channel keys that have a data directory.
+
+    Args:
+        data_dir: Root data directory.
+
+    Returns:
+        Sorted list of channel keys.
+    """
+    root = os.path.join(data_dir, CHANNELS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if os.path.isdir(os.path.join(root, name))
+    )
+
+
+def select_channel(data_dir="data"):
+    """
+    Sidebar widget for picking the active channel, shared across pages.
+
+    Args:
+        data_dir: Root data directory.
+
+    Returns:
+        Selected channel key, or None for the shared data/ directory.
+    """
+    options = [None] + list_channels(data_dir)
+    current = st.session_state.get("channel")
+    index = options.index(current) if current in options else 0
+
+    channel = st.sidebar.selectbox(
+        "📺 Channel",
+        options,
+        index=index,
+        format_func=lambda key: "Default" if key is None else key,
+    )
+    st.session_state["channel"] = channel
+    return channel
+
+
+def dataset_path(key, channel=None, data_dir="data"):
+    """
+    Resolve the file backing a dataset, preferring an up-to-date Parquet copy over the CSV.
+
+    Args:
+        key: Dataset key from DATA_FILES (e.g. "geo_data").
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        Path to the dataset file, or None if it does not exist.
+    """
+    csv_path = os.path.join(channel_data_dir(channel, data_dir), DATA_FILES[key])
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+
+    if not os.path.exists(csv_path):
+        return parquet_path if os.path.exists(parquet_path) else None
+
+    # The Parquet copy is only used if it was made from the current CSV
+    if os.path.exists(parquet_path) and _parquet_source(parquet_path) == _csv_signature(csv_path):
+        return parquet_path
+    return csv_path
+
+
+def dataset_version(key, channel=None, data_dir="data"):
+    """
+    Version of the file backing a dataset, for keying caches without reading it.
+
+    Args:
+        key: Dataset key from DATA_FILES (e.g. "video_data").
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        Tuple (path, mtime_ns, size), or None if the dataset does not exist.
+    """
+    path = dataset_path(key, channel, data_dir)
+    if path is None:
+        return None
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _csv_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _parquet_source(parquet_path):
+    try:
+        import pyarrow.parquet as pq
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        return json.loads(metadata[PARQUET_SOURCE_KEY])
+    except Exception:
+        return None
+
+
+def convert_to_parquet(key, channel=None, data_dir="data"):
+    """
+    Write a Parquet copy of a dataset's CSV next to it, for faster loading and queries.
+
+    Args:
+        key: Dataset key from DATA_FILES (e.g. "video_data").
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        Path to the Parquet file, or None if the CSV does not exist.
+    """
+    csv_path = os.path.join(channel_data_dir(channel, data_dir), DATA_FILES[key])
+    if not os.path.exists(csv_path):
+        return None
+
+    # Imported here: cache_utils depends on this module
+    from utils.cache_utils import write_atomic
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Taken before reading: if the CSV is replaced meanwhile, the copy no longer matches it
+    signature = _csv_signature(csv_path)
+    table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), PARQUET_SOURCE_KEY: json.dumps(signature)})
+
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    write_atomic(parquet_path, lambda tmp_path: pq.write_table(table, tmp_path))
+    return parquet_path
+
+
+def read_dataset_file(path):
+    """
+    Read a dataset file (CSV or Parquet) into a DataFrame.
+    """
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
 @st.cache_data
-def load_all_data(data_dir="data", verbose=True):
+def load_dataset(key, channel=None, data_dir="data", verbose=True):
+    """
+    Load a single dataset of a channel.
+
+    Args:
+        key: Dataset key from DATA_FILES (e.g. "video_data").
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+        verbose: Flag for logging information.
+
+    Returns:
+        DataFrame with the dataset, empty if it is missing or unreadable.
+    """
+    file_name = DATA_FILES[key]
+    channel_dir = channel_data_dir(channel, data_dir)
+    path = dataset_path(key, channel, data_dir)
+
+    if path is None:
+        if verbose:
+            st.warning(f"⚠️ {file_name} not found in {channel_dir}/")
+        return pd.DataFrame()
+
+    try:
+        df = read_dataset_file(path)
+        if verbose:
+            st.info(f"📁 Loaded: {file_name} ({len(df)} rows)")
+        return df
+    except Exception as e:
+        st.error(f"❌ Failed to load {file_name}: {e}")
+        return pd.DataFrame()
+
+
+def load_all_data(data_dir="data", verbose=True, channel=None):
     """
     Load all required CSV datasets from the specified data/ directory.
 
     Args:
         data_dir: Directory where CSV files are stored.
         verbose: Flag for logging information.
+        channel: Channel key, or None for the shared data/ directory.
 
     Returns:
         Tuple of DataFrames: (video_data, geo_data, daily_views, comments)
     """
-    # Dictionary to map DataFrame names to file paths
-    files = {
-        "video_data": "Processed_Video_Data.csv",
-        "geo_data": "Aggregated_Metrics_By_Country_And_Subscriber_Status.csv",
-        "daily_views": "Daily_Views_Over_Time.csv",
-        "comments": "Processed_Comments_Sentiment.csv"
-    }
-
-    dataframes = {}
-
-    # Check for each file and load if it exists
-    for key, file_name in files.items():
-        path = os.path.join(data_dir, file_name)
-        
-        if os.path.exists(path):
-            try:
-                df = pd.read_csv(path)
-                dataframes[key] = df
-                if verbose:
-                    st.info(f"📁 Loaded: {file_name} ({len(df)} rows)")
-            except Exception as e:
-                st.error(f"❌ Failed to load {file_name}: {e}")
-                dataframes[key] = pd.DataFrame()
-        else:
-            if verbose:
-                st.warning(f"⚠️ {file_name} not found in {data_dir}/")
-            dataframes[key] = pd.DataFrame()
-
-    # Return dataframes, ensuring each key is present
-    return (
-        dataframes.get("video_data", pd.DataFrame()),
-        dataframes.get("geo_data", pd.DataFrame()),
-        dataframes.get("daily_views", pd.DataFrame()),
-        dataframes.get("comments", pd.DataFrame())
+    # Each dataset is cached on its own, so channels never evict each other
+    return tuple(
+        load_dataset(key, channel=channel, data_dir=data_dir, verbose=verbose)
+        for key in ("video_data", "geo_data", "daily_views", "comments")
     )
 
-def check_and_upload_files(data_dir="data"):
+
+def _aggregate_channel(key, channel, by, values, data_dir):
+    """
+    Map step of aggregate_channels: partial sums of a single channel, streamed from its file.
+    """
+    path = dataset_path(key, channel, data_dir)
+    if path is None or not set(by + values) <= set(source_columns(path)):
+        return None
+
+    if by:
+        partial = group_aggregate(path, by, values)
+    else:
+        partial = pd.DataFrame([chunk.sum() for chunk in iter_chunks(path, columns=values)], columns=values)
+        partial = partial.sum().to_frame().T
+    partial.insert(0, "channel", channel)
+    return partial
+
+
+def aggregate_channels(key, values, by=(), channels=None, data_dir="data", max_workers=8):
+    """
+    Sum metrics of a dataset across channels, one map task per channel.
+
+    Args:
+        key: Dataset key from DATA_FILES (e.g. "video_data").
+        values: Numeric columns to sum.
+        by: Extra columns to group by within each channel.
+        channels: Channel keys to include, defaults to all channels.
+        data_dir: Root data directory.
+        max_workers: Maximum number of channels read in parallel.
+
+    Returns:
+        DataFrame with one row per channel (and group), plus the summed values.
+    """
+    channels = tuple(list_channels(data_dir) if channels is None else channels)
+    # Keyed on every channel's file version, so new uploads are picked up without clearing the cache
+    versions = tuple(dataset_version(key, channel, data_dir) for channel in channels)
+    return _aggregate_channels(key, tuple(values), tuple(by), channels, data_dir, max_workers, versions)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _aggregate_channels(key, values, by, channels, data_dir, max_workers, versions):
+    by, values = list(by), list(values)
+    if not channels:
+        return pd.DataFrame(columns=["channel"] + by + values)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(channels))) as pool:
+        partials = pool.map(
+            lambda channel: _aggregate_channel(key, channel, by, values, data_dir),
+            channels,
+        )
+        partials = [part for part in partials if part is not None]
+
+    if not partials:
+        return pd.DataFrame(columns=["channel"] + by + values)
+
+    # Reduce step: channels are disjoint, so partials only need concatenating
+    return pd.concat(partials, ignore_index=True)
+
+
+def check_and_upload_files(data_dir="data", channel=None):
     """
     Helper function to allow users to upload CSV files if any data is missing.
 
     Args:
         data_dir: Directory where files should be uploaded.
+        channel: Channel key, or None for the shared data/ directory.
     """
+    data_dir = channel_data_dir(channel, data_dir)
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
         st.info(f"Created directory: {data_dir}")
 
     uploaded_files = st.file_uploader("Upload missing files", accept_multiple_files=True, type=["csv"])
-    
+
     missing_files = []
-    required_files = {
-        "Processed_Video_Data.csv": "video_data",
-        "Aggregated_Metrics_By_Country_And_Subscriber_Status.csv": "geo_data",
-        "Daily_Views_Over_Time.csv": "daily_views",
-        "Processed_Comments_Sentiment.csv": "comments"
-    }
-    
+    required_files = {file_name: key for key, file_name in DATA_FILES.items()}
+
     for file_name, data_key in required_files.items():
         if not os.path.exists(os.path.join(data_dir, file_name)):
             missing_files.append(file_name)
@@ -79,11 +350,11 @@ def check_and_upload_files(data_dir="data"):
         st.warning(f"⚠️ Missing the following required files: {', '.join(missing_files)}")
     else:
         st.success("All required files are present!")
-        
+
     for uploaded_file in uploaded_files:
         with open(os.path.join(data_dir, uploaded_file.name), "wb") as f:
             f.write(uploaded_file.getbuffer())
         st.success(f"✅ Uploaded: {uploaded_file.name}")
-    
+
     # Return updated status
     return missing_files
@@ -0,0 +1,214 @@
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from utils.cache_utils import get_file_artifact
+from utils.query_utils import iter_chunks
+from utils.text_utils import clean_comments
+
+# MinHash parameters: 64 permutations split into 8 LSH bands of 8 rows.
+# Two comments become LSH candidates when their estimated Jaccard similarity
+# of character shingles is above roughly (1/8) ** (1/8) ~= 0.77; candidates
+# are then only clustered if their signatures agree on SIMILARITY_THRESHOLD.
+NUM_PERM = 64
+BANDS = 8
+SHINGLE_SIZE = 5
+SEED = 42
+SIMILARITY_THRESHOLD = 0.8
+
+# Representatives kept per LSH bucket, one per cluster seen in it. Bounded so
+# a bucket shared by many unrelated comments stays cheap to check.
+MAX_BUCKET_REPRESENTATIVES = 8
+
+# Comments hashed per chunk (and per worker task)
+CHUNK_SIZE = 50_000
+
+# Largest 32-bit prime: keeps (a * h + b) inside uint64 for 32-bit a, b, h
+_PRIME = np.uint64(4294967291)
+
+DUPLICATES_SUBDIR = "duplicate_clusters"
+
+
+def _permutations(num_perm=NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def _shingles(text, shingle_size=SHINGLE_SIZE):
+    text = text.lower()
+    if len(text) <= shingle_size:
+        return {text}
+    return {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+    """
+    MinHash signatures of the character shingles of each text.
+
+    Args:
+        texts: Iterable of strings (None/NaN/empty strings are allowed).
+        num_perm: Number of hash permutations per signature.
+        shingle_size: Length of the character shingles.
+        seed: Seed of the permutations (signatures are only comparable for equal seeds).
+
+    Returns:
+        uint32 array of shape (len(texts), num_perm). Empty texts get an all-max
+        row, which assign_duplicate_clusters never groups.
+    """
+    a, b = _permutations(num_perm, seed)
+    texts = list(texts)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    for row, text in enumerate(texts):
+        if not isinstance(text, str) or not text.strip():
+            continue
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(text, shingle_size)),
+            dtype=np.uint64,
+        )
+        signatures[row] = ((a * hashes + b) % _PRIME).min(axis=1)
+
+    return signatures
+
+
+def _chunks(texts, chunk_size):
+    for start in range(0, len(texts), chunk_size):
+        yield texts[start:start + chunk_size]
+
+
+def _find(parent, i):
+    # Union-find root lookup with path halving
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def assign_duplicate_clusters(texts, bands=BANDS, chunk_size=CHUNK_SIZE, max_workers=1,
+                              threshold=SIMILARITY_THRESHOLD):
+    """
+    Group identical and near-identical texts with MinHash LSH.
+
+    Signatures are computed chunk by chunk (in parallel processes when
+    max_workers > 1) and fed into the LSH buckets as they arrive. Each LSH
+    candidate pair is checked against `threshold` before it is merged, so
+    unrelated texts that share a band by chance do not chain into one cluster.
+    Buckets keep a representative of each cluster they hold (up to
+    MAX_BUCKET_REPRESENTATIVES), so a text that fails against one is still
+    checked against the others.
+
+    Args:
+        texts: Sequence of strings.
+        bands: Number of LSH bands (must divide NUM_PERM).
+        chunk_size: Texts hashed per chunk.
+        max_workers: Processes used to compute signatures.
+        threshold: Minimum estimated Jaccard similarity (share of equal
+            signature values) of two texts merged into a cluster.
+
+    Returns:
+        int64 array of cluster IDs, numbered in order of first appearance.
+    """
+    if NUM_PERM % bands:
+        raise ValueError(f"❌ bands must divide {NUM_PERM}, got {bands}")
+
+    texts = list(texts)
+    rows = NUM_PERM // bands
+    parent = np.arange(len(texts), dtype=np.int64)
+    buckets = [{} for _ in range(bands)]
+    # Signatures of earlier chunks are needed to verify candidates (4 bytes per permutation and text)
+    all_signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    empty = np.iinfo(np.uint32).max
+
+    def insert(signatures, offset):
+        all_signatures[offset:offset + len(signatures)] = signatures
+        for i, signature in enumerate(signatures):
+            doc = offset + i
+            if signature[0] == empty:
+                continue
+            for band in range(bands):
+                key = signature[band * rows:(band + 1) * rows].tobytes()
+                representatives = buckets[band].setdefault(key, [])
+                merged = False
+                for other in representatives:
+                    root, other_root = _find(parent, doc), _find(parent, other)
+                    if root == other_root:
+                        merged = True
+                    elif (signature == all_signatures[other]).mean() >= threshold:
+                        parent[max(root, other_root)] = min(root, other_root)
+                        merged = True
+                # A text that joined none of the bucket's clusters represents a new one
+                if not merged and len(representatives) < MAX_BUCKET_REPRESENTATIVES:
+                    representatives.append(doc)
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for n, signatures in enumerate(pool.map(minhash_signatures, _chunks(texts, chunk_size))):
+                insert(signatures, n * chunk_size)
+    else:
+        for n, chunk in enumerate(_chunks(texts, chunk_size)):
+            insert(minhash_signatures(chunk), n * chunk_size)
+
+    roots = np.array([_find(parent, i) for i in range(len(texts))], dtype=np.int64)
+    # Dense IDs in order of first appearance
+    _, cluster_ids = np.unique(roots, return_inverse=True)
+    return cluster_ids.astype(np.int64)
+
+
+def get_duplicate_clusters(path, cache_dir=None, max_workers=1):
+    """
+    Duplicate cluster IDs of a stored comments file, built once per file version.
+
+    The comments are read and cleaned chunk by chunk (see clean_comments).
+
+    Args:
+        path: Comments file (CSV or Parquet) with a "Comments" column.
+        cache_dir: Cache directory, or None to skip persistence.
+        max_workers: Processes used to compute signatures once there is more than one chunk.
+
+    Returns:
+        int64 array of cluster IDs, one per row of the file (see assign_duplicate_clusters).
+    """
+    def build(path):
+        texts = []
+        for chunk in iter_chunks(path, columns=["Comments"]):
+            texts += clean_comments(chunk)["clean_comment"].tolist()
+        workers = max_workers if len(texts) > CHUNK_SIZE else 1
+        return {"cluster_id": assign_duplicate_clusters(texts, max_workers=workers)}
+
+    return get_file_artifact(path, cache_dir, DUPLICATES_SUBDIR, build)["cluster_id"]
+
+
+def add_duplicate_clusters(df, column="clean_comment", max_workers=1, cluster_ids=None):
+    """
+    Add `cluster_id` and `cluster_size` columns grouping duplicate texts.
+
+    Args:
+        df: DataFrame with a text column.
+        column: Text column to deduplicate.
+        max_workers: Processes used to compute signatures.
+        cluster_ids: Cluster IDs of the rows, if already known (see get_duplicate_clusters).
+
+    Returns:
+        Copy of df with the two extra columns.
+    """
+    result = df.copy()
+    if cluster_ids is None:
+        cluster_ids = assign_duplicate_clusters(result[column].tolist(), max_workers=max_workers)
+    result["cluster_id"] = cluster_ids
+    result["cluster_size"] = result.groupby("cluster_id")["cluster_id"].transform("size")
+    return result
+
+
+def collapse_duplicates(df):
+    """
+    Keep the first comment of each duplicate cluster.
+
+    Args:
+        df: DataFrame returned by add_duplicate_clusters.
+
+    Returns:
+        One row per cluster; `cluster_size` is the number of comments it stands for.
+    """
+    return df.drop_duplicates(subset="cluster_id", keep="first")
@@ -0,0 +1,425 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.cache_utils import file_fingerprint, write_text_atomic
+from utils.data_utils import dataset_version, frame_fingerprint
+from utils.model_utils import predict_views_batch
+
+# Histogram bins per feature, cut at the training-data quantiles
+NUM_BINS = 10
+
+# Column holding the model output in reference and scored frames
+PREDICTION_COLUMN = "Predicted Views"
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+
+# Smoothing for empty bins (PSI takes the log of bin proportions)
+_EPSILON = 1e-4
+
+# Scored batches kept in the trend history
+MAX_HISTORY = 500
+
+DRIFT_SUBDIR = "drift"
+# Monitors kept on disk per cache directory (one per training data / model version)
+MAX_CACHED_MONITORS = 8
+
+# Monitors are read, updated and written back as a whole
+_lock = threading.Lock()
+
+
+def _empty_stats(n_bins):
+    return {"counts": [0] * n_bins, "missing": 0, "n": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+
+
+def _batch_stats(values, edges):
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    finite = values[np.isfinite(values)]
+    counts = np.bincount(np.searchsorted(edges, finite, side="right"), minlength=len(edges) + 1)
+    if not len(finite):
+        return {**_empty_stats(len(edges) + 1), "missing": int(len(values))}
+
+    mean = float(finite.mean())
+    return {
+        "counts": counts.tolist(),
+        "missing": int(len(values) - len(finite)),
+        "n": int(len(finite)),
+        "mean": mean,
+        "m2": float(((finite - mean) ** 2).sum()),
+        "min": float(finite.min()),
+        "max": float(finite.max()),
+    }
+
+
+def _merge_stats(stats, other):
+    # Chan et al. parallel update of Welford's running mean and sum of squares
+    n = stats["n"] + other["n"]
+    if other["n"]:
+        delta = other["mean"] - stats["mean"]
+        stats["mean"] += delta * other["n"] / n
+        stats["m2"] += other["m2"] + delta ** 2 * stats["n"] * other["n"] / n
+        stats["min"] = other["min"] if stats["min"] is None else min(stats["min"], other["min"])
+        stats["max"] = other["max"] if stats["max"] is None else max(stats["max"], other["max"])
+    stats["n"] = n
+    stats["missing"] += other["missing"]
+    stats["counts"] = [a + b for a, b in zip(stats["counts"], other["counts"])]
+    return stats
+
+
+def _proportions(stats):
+    counts = np.asarray(stats["counts"], dtype=float)
+    return counts / counts.sum() if counts.sum() else counts
+
+
+def psi(reference, current):
+    """
+    Population Stability Index between two binned distributions.
+
+    Args:
+        reference: Stats dict of the reference (training) data.
+        current: Stats dict of the scored data, over the same bins.
+
+    Returns:
+        PSI value, or NaN when either side is empty.
+    """
+    if not reference["n"] or not current["n"]:
+        return float("nan")
+    expected = np.clip(_proportions(reference), _EPSILON, None)
+    actual = np.clip(_proportions(current), _EPSILON, None)
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+def ks_statistic(reference, current):
+    """
+    Kolmogorov-Smirnov statistic estimated from the binned distributions.
+
+    The CDFs are only compared at the bin edges, so this is a lower bound of
+    the exact statistic with a resolution of about 1 / NUM_BINS.
+
+    Args:
+        reference: Stats dict of the reference (training) data.
+        current: Stats dict of the scored data, over the same bins.
+
+    Returns:
+        KS statistic in [0, 1], or NaN when either side is empty.
+    """
+    if not reference["n"] or not current["n"]:
+        return float("nan")
+    return float(np.abs(np.cumsum(_proportions(reference)) - np.cumsum(_proportions(current))).max())
+
+
+def sketch_quantiles(stats, edges, quantiles=(0.25, 0.5, 0.75)):
+    """
+    Approximate quantiles of a sketch, interpolated linearly inside its bins.
+
+    Args:
+        stats: Stats dict.
+        edges: Inner bin edges of the sketch.
+        quantiles: Quantiles to estimate, in [0, 1].
+
+    Returns:
+        List of estimated values (NaN when the sketch is empty).
+    """
+    if not stats["n"]:
+        return [float("nan")] * len(quantiles)
+    # The outer bins are bounded by the observed min and max
+    bounds = np.array([stats["min"], *edges, stats["max"]], dtype=float)
+    bounds = np.clip(bounds, stats["min"], stats["max"])
+    cumulative = np.concatenate([[0.0], np.cumsum(_proportions(stats))])
+    return [float(np.interp(q, cumulative, bounds)) for q in quantiles]
+
+
+def _std(stats):
+    return float(np.sqrt(stats["m2"] / (stats["n"] - 1))) if stats["n"] > 1 else float("nan")
+
+
+def build_drift_monitor(reference, n_bins=NUM_BINS):
+    """
+    Build the reference sketches of every numeric column of the training data.
+
+    Args:
+        reference: Training feature DataFrame, optionally with a PREDICTION_COLUMN
+            holding the model output on the same rows.
+        n_bins: Histogram bins per feature, cut at the reference quantiles.
+
+    Returns:
+        Monitor dict with the per-feature sketches and an empty history.
+    """
+    features = {}
+    for column in reference.columns:
+        if not pd.api.types.is_numeric_dtype(reference[column]):
+            continue
+        values = reference[column].to_numpy(dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        # Repeated quantiles (e.g. mostly-zero counts) collapse into one edge
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])).tolist()
+        features[column] = {
+            "edges": edges,
+            "reference": _batch_stats(reference[column], edges),
+            "current": _empty_stats(len(edges) + 1),
+        }
+
+    return {
+        "reference_fingerprint": frame_fingerprint(reference),
+        "created": time.time(),
+        "features": features,
+        "history": [],
+    }
+
+
+def update_drift_monitor(monitor, batch, fingerprint=None):
+    """
+    Add a scored batch to the running sketches (in place) and record its drift.
+
+    Only bin counts and running moments are kept, so memory does not grow
+    with the number of rows scored.
+
+    Args:
+        monitor: Monitor dict.
+        batch: Scored feature DataFrame, optionally with a PREDICTION_COLUMN.
+        fingerprint: Batch fingerprint recorded in the history.
+
+    Returns:
+        The updated monitor.
+    """
+    entry = {"time": time.time(), "fingerprint": fingerprint, "n_rows": int(len(batch)), "psi": {}, "ks": {}}
+    for column, sketch in monitor["features"].items():
+        if column not in batch.columns:
+            continue
+        stats = _batch_stats(batch[column], sketch["edges"])
+        entry["psi"][column] = psi(sketch["reference"], stats)
+        entry["ks"][column] = ks_statistic(sketch["reference"], stats)
+        _merge_stats(sketch["current"], stats)
+
+    monitor["history"] = (monitor["history"] + [entry])[-MAX_HISTORY:]
+    return monitor
+
+
+def reset_drift_monitor(monitor):
+    """
+    Clear the scored-data sketches and history (in place), keeping the reference.
+    """
+    for sketch in monitor["features"].values():
+        sketch["current"] = _empty_stats(len(sketch["edges"]) + 1)
+    monitor["history"] = []
+    return monitor
+
+
+def drift_status(value):
+    """
+    Status label of a PSI value: "stable", "moderate", "significant" or "no data".
+    """
+    if value is None or np.isnan(value):
+        return "no data"
+    if value >= PSI_ALERT:
+        return "significant"
+    if value >= PSI_WARN:
+        return "moderate"
+    return "stable"
+
+
+def drift_report(monitor):
+    """
+    Drift of all scored data so far against the reference, per feature.
+
+    Returns:
+        DataFrame with PSI, KS, status and reference/current moments and
+        medians per feature, most drifted first.
+    """
+    rows = []
+    for column, sketch in monitor["features"].items():
+        reference, current = sketch["reference"], sketch["current"]
+        value = psi(reference, current)
+        rows.append({
+            "Feature": column,
+            "PSI": value,
+            "KS": ks_statistic(reference, current),
+            "Status": drift_status(value),
+            "Reference Mean": reference["mean"],
+            "Current Mean": current["mean"] if current["n"] else float("nan"),
+            "Reference Std": _std(reference),
+            "Current Std": _std(current),
+            "Reference Median": sketch_quantiles(reference, sketch["edges"], (0.5,))[0],
+            "Current Median": sketch_quantiles(current, sketch["edges"], (0.5,))[0],
+            "Scored Rows": current["n"],
+            "Missing": current["missing"],
+        })
+    return pd.DataFrame(rows).sort_values("PSI", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def drift_history(monitor, metric="psi"):
+    """
+    Per-batch drift of each feature, in scoring order.
+
+    Args:
+        monitor: Monitor dict.
+        metric: "psi" or "ks".
+
+    Returns:
+        Long DataFrame with Batch, Scored At, Rows, Feature and Value columns.
+    """
+    rows = [
+        {"Batch": index + 1, "Scored At": pd.to_datetime(entry["time"], unit="s").floor("s"),
+         "Rows": entry["n_rows"], "Feature": column, "Value": value}
+        for index, entry in enumerate(monitor["history"])
+        for column, value in entry[metric].items()
+    ]
+    return pd.DataFrame(rows, columns=["Batch", "Scored At", "Rows", "Feature", "Value"])
+
+
+def bin_comparison(monitor, column):
+    """
+    Reference and scored-data proportions of each bin of one feature.
+
+    Returns:
+        DataFrame with Bin, Reference and Current columns.
+    """
+    sketch = monitor["features"][column]
+    edges = [f"{edge:,.4g}" for edge in sketch["edges"]]
+    labels = [f"< {edges[0]}"] if edges else ["all"]
+    labels += [f"{low} – {high}" for low, high in zip(edges, edges[1:])]
+    labels += [f"≥ {edges[-1]}"] if edges else []
+    return pd.DataFrame({
+        "Bin": labels,
+        "Reference": _proportions(sketch["reference"]),
+        "Current": _proportions(sketch["current"]),
+    })
+
+
+def get_drift_reference(video_data, model, channel=None, data_dir="data", model_path="xgboost_views_model.pkl"):
+    """
+    Training features and the model's predictions on them: the baseline scored batches are compared against.
+
+    Cached per channel and version of its video data and model files, so the
+    Predictions page and the precompute job share one entry.
+
+    Args:
+        video_data: Video DataFrame of the channel.
+        model: Trained model with the feature names of its booster.
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+        model_path: Model file the model was loaded from.
+
+    Returns:
+        Tuple (reference DataFrame with a PREDICTION_COLUMN, its frame_fingerprint).
+    """
+    model_version = file_fingerprint(model_path) if os.path.exists(model_path) else None
+    return _drift_reference(channel, dataset_version("video_data", channel, data_dir), model_version, video_data, model)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _drift_reference(channel, data_version, model_version, _video_data, _model):
+    # Keyed on the channel and the versions of its video data and model files; the frame and model aren't hashed
+    reference = _video_data[_model.get_booster().feature_names].copy()
+    reference[PREDICTION_COLUMN] = predict_views_batch(_model, reference)
+    return reference, frame_fingerprint(reference)
+
+
+def _monitor_path(cache_dir, reference_fingerprint):
+    return os.path.join(cache_dir, DRIFT_SUBDIR, f"{reference_fingerprint}.json")
+
+
+def _load_monitor(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def save_drift_monitor(monitor, cache_dir):
+    """
+    Write the monitor to <cache_dir>/drift/<reference fingerprint>.json.
+    """
+    path = _monitor_path(cache_dir, monitor["reference_fingerprint"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_text_atomic(path, json.dumps(monitor))
+
+    monitor_dir = os.path.dirname(path)
+    stored = sorted(
+        (os.path.join(monitor_dir, name) for name in os.listdir(monitor_dir) if name.endswith(".json")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for stale in stored[MAX_CACHED_MONITORS:]:
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            pass
+
+
+def get_drift_monitor(reference, cache_dir=None, reference_fingerprint=None):
+    """
+    Return the stored monitor of this reference data, or build and store a new one.
+
+    Args:
+        reference: Training feature DataFrame (see build_drift_monitor).
+        cache_dir: Cache directory, or None to skip persistence.
+        reference_fingerprint: frame_fingerprint(reference), if already known.
+
+    Returns:
+        Monitor dict.
+    """
+    if cache_dir is None:
+        return build_drift_monitor(reference)
+
+    path = _monitor_path(cache_dir, reference_fingerprint or frame_fingerprint(reference))
+    monitor = _load_monitor(path)
+    if monitor is None:
+        # Stored right away, so the reference sketches are built once
+        with _lock:
+            monitor = _load_monitor(path)
+            if monitor is None:
+                monitor = build_drift_monitor(reference)
+                save_drift_monitor(monitor, cache_dir)
+    return monitor
+
+
+def record_scored_batch(reference, batch, cache_dir=None, reference_fingerprint=None):
+    """
+    Add a scored batch to the stored monitor of `reference`.
+
+    A batch whose fingerprint is already in the history is not counted again,
+    so Streamlit reruns of the same prediction do not skew the statistics.
+
+    Args:
+        reference: Training feature DataFrame (see build_drift_monitor).
+        batch: Scored feature DataFrame, optionally with a PREDICTION_COLUMN.
+        cache_dir: Cache directory, or None to skip persistence.
+        reference_fingerprint: frame_fingerprint(reference), if already known.
+
+    Returns:
+        The updated monitor.
+    """
+    fingerprint = frame_fingerprint(batch)
+    monitor = get_drift_monitor(reference, cache_dir, reference_fingerprint)
+    with _lock:
+        # Re-read under the lock: another session may have recorded a batch meanwhile
+        if cache_dir is not None:
+            monitor = _load_monitor(_monitor_path(cache_dir, monitor["reference_fingerprint"])) or monitor
+        if any(entry["fingerprint"] == fingerprint for entry in monitor["history"]):
+            return monitor
+        update_drift_monitor(monitor, batch, fingerprint)
+        if cache_dir is not None:
+            save_drift_monitor(monitor, cache_dir)
+    return monitor
+
+
+def clear_scored_batches(reference, cache_dir=None, reference_fingerprint=None):
+    """
+    Reset the stored monitor of `reference` to its training-data sketches.
+    """
+    monitor = get_drift_monitor(reference, cache_dir, reference_fingerprint)
+    with _lock:
+        monitor = reset_drift_monitor(monitor)
+        if cache_dir is not None:
+            save_drift_monitor(monitor, cache_dir)
+    return monitor
@@ -0,0 +1,255 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from utils.cache_utils import write_atomic, write_text_atomic
+from utils.data_utils import CHANNELS_DIR, channel_data_dir, frame_fingerprint
+
+MANIFEST_FILE = "manifest.json"
+
+# Extracts are only written under this root (same channels/<channel>/ layout as
+# data/), or under the channel's data directory when it is not set
+EXPORT_ROOT_ENV = "POWERBI_EXPORT_ROOT"
+DEFAULT_EXTRACT_NAME = "powerbi_extract"
+
+# Column each extract table is partitioned on; date columns are split by month
+PARTITION_COLUMNS = {
+    "video_data": "Video publish date",
+    "geo_data": "Country Code",
+    "daily_views": "Video publish date",
+    "comments": "DateOnly",
+    "predictions": "Video publish date",
+}
+DATE_PARTITIONS = {"Video publish date", "DateOnly"}
+
+# Partition of rows whose partition value is missing
+UNKNOWN_PARTITION = "unknown"
+
+# Columns of the predictions table (besides the prediction itself)
+PREDICTION_COLUMNS = ["Video", "Video title", "Video publish date", "Views"]
+
+# Partition files written in parallel
+MAX_WORKERS = 4
+
+
+def _partition_keys(df, column):
+    if column is None or column not in df.columns:
+        return pd.Series("all", index=df.index)
+    if column in DATE_PARTITIONS:
+        keys = pd.to_datetime(df[column], errors="coerce").dt.strftime("%Y-%m")
+    else:
+        keys = df[column].astype("string")
+    # Keys become file names
+    return keys.fillna(UNKNOWN_PARTITION).map(lambda key: re.sub(r"[^A-Za-z0-9_-]", "_", key))
+
+
+def export_dir(channel=None, name=DEFAULT_EXTRACT_NAME, data_dir="data"):
+    """
+    Folder of a channel's extract, inside the configured export root.
+
+    Args:
+        channel: Channel key, or None for the shared data/ directory.
+        name: Extract folder name (letters, digits, '-' or '_').
+        data_dir: Root data directory, used when EXPORT_ROOT_ENV is not set.
+
+    Returns:
+        Path to the extract folder.
+    """
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", name) or name == CHANNELS_DIR:
+        raise ValueError(f"❌ Invalid extract name: {name!r} (use letters, digits, '-' or '_')")
+    return os.path.join(channel_data_dir(channel, os.environ.get(EXPORT_ROOT_ENV) or data_dir), name)
+
+
+def _partition_path(out_dir, table, file):
+    """
+    Absolute path of a partition file, or None if it would fall outside <out_dir>/<table>/.
+    """
+    table_dir = os.path.realpath(os.path.join(out_dir, table))
+    path = os.path.realpath(os.path.join(out_dir, file))
+    return path if os.path.dirname(path) == table_dir else None
+
+
+def split_partitions(df, column=None):
+    """
+    Split a table into partitions.
+
+    Args:
+        df: Table to split.
+        column: Partition column (month for date columns, value otherwise),
+            or None for a single partition.
+
+    Returns:
+        Dict {partition key: DataFrame}, in key order.
+    """
+    keys = _partition_keys(df, column)
+    return {key: part.reset_index(drop=True) for key, part in df.groupby(keys, sort=True)}
+
+
+def load_manifest(out_dir):
+    """
+    Manifest of the last export to `out_dir`, or an empty one.
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"exported_at": None, "tables": {}}
+
+
+def _write_partition(part, path):
+    write_atomic(path, lambda tmp_path: part.to_parquet(tmp_path, index=False))
+    return os.path.getsize(path)
+
+
+def export_table(df, table, out_dir, previous=None, partition_by=None, max_workers=MAX_WORKERS):
+    """
+    Write the partitions of one table that changed since the previous export.
+
+    Each partition is stored as <out_dir>/<table>/<table>_<key>.parquet.
+    A partition is rewritten only when its content hash differs from the
+    previous manifest entry (or its file is gone); partitions that no longer
+    exist are deleted.
+
+    Args:
+        df: Table to export.
+        table: Table name.
+        out_dir: Extract root folder.
+        previous: Manifest entry of the table from the last export, if any.
+        partition_by: Partition column, or None for a single partition.
+        max_workers: Threads writing partition files.
+
+    Returns:
+        Tuple (manifest entry of the table, dict of written/unchanged/removed counts and bytes written).
+    """
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", table):
+        raise ValueError(f"❌ Invalid table name: {table!r}")
+    table_dir = os.path.join(out_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+    old_partitions = (previous or {}).get("partitions", {})
+
+    partitions = {}
+    to_write = {}
+    for key, part in split_partitions(df, partition_by).items():
+        file_name = f"{table}_{key}.parquet"
+        entry = {"file": f"{table}/{file_name}", "hash": frame_fingerprint(part), "rows": len(part)}
+        old = old_partitions.get(key)
+        old_path = _partition_path(out_dir, table, old["file"]) if old is not None else None
+        if old_path is not None and old["hash"] == entry["hash"] and os.path.exists(old_path):
+            partitions[key] = old
+        else:
+            partitions[key] = entry
+            to_write[key] = part
+
+    now = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sizes = dict(zip(to_write, executor.map(
+            lambda key: _write_partition(to_write[key], os.path.join(out_dir, partitions[key]["file"])),
+            to_write,
+        )))
+    for key, size in sizes.items():
+        partitions[key].update(bytes=size, updated_at=now)
+
+    removed = [key for key in old_partitions if key not in partitions]
+    for key in removed:
+        # Manifest paths are only trusted inside the table folder
+        path = _partition_path(out_dir, table, old_partitions[key].get("file", ""))
+        if path is None:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    entry = {
+        "partition_by": partition_by,
+        "columns": [str(column) for column in df.columns],
+        "rows": len(df),
+        "partitions": partitions,
+    }
+    stats = {
+        "written": len(to_write),
+        "unchanged": len(partitions) - len(to_write),
+        "removed": len(removed),
+        "bytes_written": sum(sizes.values()),
+    }
+    return entry, stats
+
+
+def export_extract(tables, out_dir, max_workers=MAX_WORKERS):
+    """
+    Incrementally export tables to a partitioned Parquet extract with a manifest.
+
+    Tables missing from `tables` keep their previous partitions. The manifest
+    is written last, so an interrupted export is simply redone on the next run.
+
+    Args:
+        tables: Dict {table name: DataFrame}. Partition columns come from PARTITION_COLUMNS.
+        out_dir: Extract root folder (local or a mounted share).
+        max_workers: Threads writing partition files.
+
+    Returns:
+        DataFrame with one row per exported table: partitions written, unchanged
+        and removed, rows and bytes written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    rows = []
+    for table, df in tables.items():
+        entry, stats = export_table(
+            df, table, out_dir,
+            previous=manifest["tables"].get(table),
+            partition_by=PARTITION_COLUMNS.get(table),
+            max_workers=max_workers,
+        )
+        manifest["tables"][table] = entry
+        rows.append({
+            "Table": table,
+            "Partitions": len(entry["partitions"]),
+            "Written": stats["written"],
+            "Unchanged": stats["unchanged"],
+            "Removed": stats["removed"],
+            "Rows": entry["rows"],
+            "Bytes Written": stats["bytes_written"],
+        })
+
+    manifest["exported_at"] = time.time()
+    write_text_atomic(os.path.join(out_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    return pd.DataFrame(rows)
+
+
+def manifest_summary(manifest):
+    """
+    One row per table of a manifest: partitions, rows, size and last change.
+    """
+    rows = []
+    for table, entry in manifest["tables"].items():
+        partitions = entry["partitions"].values()
+        rows.append({
+            "Table": table,
+            "Partitioned By": entry["partition_by"] or "—",
+            "Partitions": len(partitions),
+            "Rows": entry["rows"],
+            "Size (MB)": round(sum(part.get("bytes", 0) for part in partitions) / 1e6, 2),
+            "Last Changed": pd.to_datetime(max((part.get("updated_at", 0) for part in partitions), default=0), unit="s"),
+        })
+    return pd.DataFrame(rows)
+
+
+def predictions_table(video_data, predictions):
+    """
+    Compact predictions table: video identifiers, actual and predicted views.
+
+    Args:
+        video_data: Video DataFrame the predictions were made on.
+        predictions: Array of predicted views, one per row.
+
+    Returns:
+        DataFrame with the PREDICTION_COLUMNS present in video_data plus "Predicted Views".
+    """
+    table = video_data[[column for column in PREDICTION_COLUMNS if column in video_data.columns]].copy()
+    table["Predicted Views"] = predictions
+    return table
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.data_utils import frame_fingerprint
+
+# Memory budget of the serialized figures kept by the shared cache
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """
+    Least-recently-used cache of serialized Plotly figures, bounded by size.
+
+    Figures are stored as JSON, so every hit returns a fresh figure that the
+    caller may update without affecting other sessions.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (figure JSON, build seconds)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "build_seconds": 0.0, "saved_seconds": 0.0}
+
+    def get(self, key, build):
+        """
+        Return the figure stored under `key`, building and storing it on a miss.
+
+        Args:
+            key: Hashable key of the figure (see figure_key).
+            build: Function () -> plotly Figure.
+
+        Returns:
+            plotly Figure.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += entry[1]
+
+        if entry is not None:
+            # The stored JSON came from a valid figure, so validation can be skipped
+            return go.Figure(json.loads(entry[0]), _validate=False)
+
+        started = time.perf_counter()
+        fig = build()
+        spec = fig.to_json()
+        elapsed = time.perf_counter() - started
+        size = len(spec)
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["build_seconds"] += elapsed
+            # Figures larger than the whole budget are never stored
+            if size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (spec, elapsed)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (evicted, _) = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+                    self._stats["evictions"] += 1
+        return fig
+
+    def stats(self):
+        """
+        Cache statistics: entries, bytes, hits, misses, hit rate, evictions and timings.
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Drop every stored figure and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats = {key: 0 if isinstance(value, int) else 0.0 for key, value in self._stats.items()}
+
+
+@st.cache_resource
+def get_figure_cache(max_bytes=MAX_CACHE_BYTES):
+    """
+    The figure cache shared by every session of the app.
+    """
+    return FigureCache(max_bytes)
+
+
+def figure_key(name, data, **params):
+    """
+    Cache key of a chart: its name, the fingerprint of its data and its parameters.
+
+    Args:
+        name: Chart name, unique per chart in the app.
+        data: DataFrame the chart is drawn from.
+        **params: Anything else the figure depends on (must be JSON-serializable or str-able).
+
+    Returns:
+        Hashable key.
+    """
+    fingerprint = frame_fingerprint(data) if isinstance(data, pd.DataFrame) else str(data)
+    return name, fingerprint, json.dumps(params, sort_keys=True, default=str)
+
+
+def cached_figure(name, data, build, **params):
+    """
+    Return a chart from the shared figure cache, building it only when the data or parameters changed.
+
+    Args:
+        name: Chart name, unique per chart in the app.
+        data: DataFrame the chart is drawn from.
+        build: Function () -> plotly Figure drawing `data` with `params`.
+        **params: Anything else the figure depends on.
+
+    Returns:
+        plotly Figure.
+    """
+    return get_figure_cache().get(figure_key(name, data, **params), build)
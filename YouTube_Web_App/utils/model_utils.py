@@ -1,5 +1,6 @@
 import joblib
 import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -23,16 +24,9 @@ def load_model(model_path="xgboost_views_model.pkl", verbose=True):
             st.error(f"❌ Error loading model: {e}")
         return None
 
-def predict_views(model, input_data):
+def _prepare_input(model, input_data):
     """
-    Predict views using the trained model.
-    
-    Parameters:
-    - model: The trained machine learning model (e.g., XGBoost)
-    - input_data: Pandas DataFrame with features required by the model
-    
-    Returns:
-    - Predicted view count
+    Validate input data and select the model's features in the expected order.
     """
     if model is None:
         raise ValueError("❌ Model not loaded. Please load a valid model first.")
@@ -50,10 +44,77 @@ def predict_views(model, input_data):
         raise ValueError(f"❌ Missing features in input data: {missing}")
 
     # Drop extra columns and reorder to match model's expected features
-    input_clean = input_data[expected_features]
+    return input_data[expected_features]
+
+def predict_views(model, input_data):
+    """
+    Predict views using the trained model.
+    
+    Parameters:
+    - model: The trained machine learning model (e.g., XGBoost)
+    - input_data: Pandas DataFrame with features required by the model
+    
+    Returns:
+    - Predicted view count
+    """
+    input_clean = _prepare_input(model, input_data)
     
     try:
         prediction = model.predict(input_clean)[0]
         return prediction
     except Exception as e:
         raise ValueError(f"❌ Error during prediction: {e}")
+
+def predict_views_batch(model, input_data):
+    """
+    Predict views for every row of the input in a single model call.
+    
+    Parameters:
+    - model: The trained machine learning model (e.g., XGBoost)
+    - input_data: Pandas DataFrame with features required by the model
+    
+    Returns:
+    - NumPy array with one predicted view count per row
+    """
+    input_clean = _prepare_input(model, input_data)
+    
+    try:
+        return np.asarray(model.predict(input_clean))
+    except Exception as e:
+        raise ValueError(f"❌ Error during prediction: {e}")
+
+def build_whatif_grid(base_row, sweeps):
+    """
+    Build a what-if grid: every combination of the swept feature values, with
+    all other features held at the base row's values.
+    
+    Parameters:
+    - base_row: Single-row Pandas DataFrame with the model features
+    - sweeps: Dict of feature name -> list of values to try (one or two features)
+    
+    Returns:
+    - Pandas DataFrame with one row per combination
+    """
+    if len(base_row) != 1:
+        raise ValueError("❌ The base input must contain exactly one row.")
+    if not 1 <= len(sweeps) <= 2:
+        raise ValueError("❌ Select one or two features to sweep.")
+    
+    features = list(sweeps)
+    missing = [col for col in features if col not in base_row.columns]
+    if missing:
+        raise ValueError(f"❌ Missing features in input data: {missing}")
+    
+    # Cartesian product of the swept values, flattened to one row per scenario
+    mesh = np.meshgrid(*[np.asarray(values) for values in sweeps.values()], indexing="ij")
+    n_rows = mesh[0].size
+    
+    grid = base_row.loc[base_row.index.repeat(n_rows)].reset_index(drop=True)
+    for feature, values in zip(features, mesh):
+        values = values.ravel()
+        # Keep integer features integer, so the model sees the same dtypes as in training
+        if pd.api.types.is_integer_dtype(base_row[feature]):
+            values = np.round(values.astype(float)).astype(base_row[feature].dtype)
+        grid[feature] = values
+    
+    return grid
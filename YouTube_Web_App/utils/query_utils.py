@@ -0,0 +1,222 @@
+import pandas as pd
+
+# DuckDB is optional: without it, file sources are scanned in pandas chunks
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Rows read per chunk by the pandas fallback
+CHUNK_SIZE = 200_000
+
+
+def _quote(column):
+    return '"' + str(column).replace('"', '""') + '"'
+
+
+def _scalar(value):
+    # numpy scalars (e.g. from distinct_values) -> plain Python values
+    return value.item() if hasattr(value, "item") else value
+
+
+def _duckdb_query(source, select, where=None, tail="", not_null=()):
+    """
+    Run "SELECT <select> FROM <source> [WHERE ...] <tail>" on an in-process DuckDB connection.
+
+    Rows with NULL in any `not_null` column are skipped, as pandas groupby and nlargest do.
+    """
+    con = duckdb.connect()
+    try:
+        if isinstance(source, pd.DataFrame):
+            con.register("source_frame", source)
+            table = "source_frame"
+        else:
+            reader = "read_parquet" if source.endswith(".parquet") else "read_csv_auto"
+            table = f"{reader}('{source.replace(chr(39), chr(39) * 2)}')"
+
+        sql = f"SELECT {select} FROM {table}"
+        conditions = [f"{_quote(col)} = ?" for col in where or {}]
+        conditions += [f"{_quote(col)} IS NOT NULL" for col in not_null]
+        params = [_scalar(value) for value in (where or {}).values()]
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" {tail}"
+
+        return con.execute(sql, params).df()
+    finally:
+        con.close()
+
+
+def iter_chunks(source, columns=None, where=None, chunk_size=None):
+    """
+    Yield filtered DataFrame chunks of a source, reading files incrementally.
+
+    Args:
+        source: DataFrame or path to a CSV/Parquet file.
+        columns: Columns to read, defaults to all columns.
+        where: Dict of column -> value equality filters.
+        chunk_size: Rows per chunk, defaults to CHUNK_SIZE.
+
+    Yields:
+        DataFrame chunks.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        chunks = (frame.iloc[start:start + chunk_size] for start in range(0, len(frame), chunk_size))
+    elif source.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(source).iter_batches(batch_size=chunk_size, columns=columns)
+            chunks = (batch.to_pandas() for batch in batches)
+        except ImportError:
+            chunks = [pd.read_parquet(source, columns=columns)]
+    else:
+        chunks = pd.read_csv(source, usecols=columns, chunksize=chunk_size)
+
+    for chunk in chunks:
+        if where:
+            mask = pd.Series(True, index=chunk.index)
+            for col, value in where.items():
+                mask &= chunk[col] == value
+            chunk = chunk[mask]
+        yield chunk
+
+
+def _needed_columns(*groups):
+    columns = []
+    for group in groups:
+        for col in group or []:
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+
+def source_columns(source):
+    """
+    Column names of a source, with a flag for numeric columns.
+
+    Args:
+        source: DataFrame or path to a CSV/Parquet file.
+
+    Returns:
+        Dict mapping column name -> True if the column is numeric.
+    """
+    if isinstance(source, pd.DataFrame):
+        sample = source.head(0)
+    elif duckdb is not None:
+        sample = _duckdb_query(source, "*", tail="LIMIT 0")
+    else:
+        sample = next(iter_chunks(source), pd.DataFrame())
+
+    return {col: pd.api.types.is_numeric_dtype(dtype) for col, dtype in sample.dtypes.items()}
+
+
+def distinct_values(source, column):
+    """
+    Sorted distinct values of a column.
+    """
+    if duckdb is not None:
+        result = _duckdb_query(source, f"DISTINCT {_quote(column)}", tail="ORDER BY 1")
+        return result[column].dropna().tolist()
+
+    values = set()
+    for chunk in iter_chunks(source, columns=[column]):
+        values.update(chunk[column].dropna().unique())
+    return sorted(values)
+
+
+def select_rows(source, columns=None, where=None):
+    """
+    Materialize only the rows (and columns) of a source matching equality filters.
+
+    Args:
+        source: DataFrame or path to a CSV/Parquet file.
+        columns: Columns to return, defaults to all columns.
+        where: Dict of column -> value equality filters.
+
+    Returns:
+        DataFrame with the matching rows.
+    """
+    if duckdb is not None:
+        select = ", ".join(_quote(col) for col in columns) if columns else "*"
+        return _duckdb_query(source, select, where=where)
+
+    read_columns = _needed_columns(columns, where) if columns else None
+    chunks = [chunk if columns is None else chunk[columns]
+              for chunk in iter_chunks(source, columns=read_columns, where=where)]
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+
+def top_k(source, by, k=10, columns=None, where=None):
+    """
+    Rows with the k largest values of a column, without sorting the whole source.
+
+    Args:
+        source: DataFrame or path to a CSV/Parquet file.
+        by: Numeric column to rank by.
+        k: Number of rows to return.
+        columns: Columns to return, defaults to all columns.
+        where: Dict of column -> value equality filters.
+
+    Returns:
+        DataFrame with at most k rows, ordered by `by` descending.
+    """
+    if duckdb is not None:
+        select = ", ".join(_quote(col) for col in _needed_columns(columns, [by])) if columns else "*"
+        return _duckdb_query(source, select, where=where, tail=f"ORDER BY {_quote(by)} DESC LIMIT {int(k)}",
+                             not_null=[by])
+
+    read_columns = _needed_columns(columns, [by], where) if columns else None
+    best = None
+    for chunk in iter_chunks(source, columns=read_columns, where=where):
+        # Keep a running top-k so only k rows per chunk survive
+        candidates = chunk if best is None else pd.concat([best, chunk])
+        best = candidates.nlargest(k, by)
+
+    if best is None:
+        return pd.DataFrame(columns=columns)
+    best = best.reset_index(drop=True)
+    return best[_needed_columns(columns, [by])] if columns else best
+
+
+def group_aggregate(source, by, values=None, agg="sum", where=None, count_name="Count"):
+    """
+    Group a source and sum columns (or count rows), returning only the aggregate.
+
+    Args:
+        source: DataFrame or path to a CSV/Parquet file.
+        by: Column name or list of column names to group by.
+        values: Columns to sum (ignored when agg="count").
+        agg: "sum" or "count".
+        where: Dict of column -> value equality filters.
+        count_name: Name of the count column when agg="count".
+
+    Returns:
+        DataFrame with one row per group, ordered by the group columns. Rows
+        with a missing group value are left out.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    values = list(values or [])
+    if agg not in ("sum", "count"):
+        raise ValueError(f"❌ Unsupported aggregation: {agg}")
+
+    if duckdb is not None:
+        keys = ", ".join(_quote(col) for col in by)
+        if agg == "count":
+            aggregates = f"COUNT(*) AS {_quote(count_name)}"
+        else:
+            # pandas sums of all-missing groups are 0, DuckDB's are NULL
+            aggregates = ", ".join(f"COALESCE(SUM({_quote(col)}), 0) AS {_quote(col)}" for col in values)
+        return _duckdb_query(source, f"{keys}, {aggregates}", where=where,
+                             tail=f"GROUP BY {keys} ORDER BY {keys}", not_null=by)
+
+    # Partial aggregates per chunk, merged by summing (valid for sums and counts)
+    partials = []
+    for chunk in iter_chunks(source, columns=_needed_columns(by, values, where), where=where):
+        grouped = chunk.groupby(by)
+        partials.append(grouped.size().rename(count_name).to_frame() if agg == "count" else grouped[values].sum())
+
+    if not partials:
+        return pd.DataFrame(columns=by + ([count_name] if agg == "count" else values))
+    return pd.concat(partials).groupby(level=by).sum().reset_index()
@@ -0,0 +1,248 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from utils.cache_utils import get_versioned_artifact
+from utils.query_utils import group_aggregate, iter_chunks
+
+# Video metrics clustered into segments (the notebook's audience features,
+# mapped to the columns of Processed_Video_Data.csv)
+VIDEO_FEATURES = ["Views", "Average Percentage viewed(%)", "Average view Duration (sec)", "Subscribers gained"]
+
+# Per-commenter engagement metrics built by commenter_features()
+COMMENTER_FEATURES = ["Comments", "Likes", "Replies", "Videos"]
+
+N_SEGMENTS = 4
+RANDOM_STATE = 42
+
+# Rows per partial_fit batch
+BATCH_SIZE = 10_000
+
+SEGMENTS_SUBDIR = "segments"
+
+# Columns added by assign_segments
+SEGMENT_COLUMNS = ["Segment", "PC1", "PC2"]
+
+
+def _feature_batches(data, features, batch_size):
+    for chunk in iter_chunks(data, columns=features, chunk_size=batch_size):
+        values = chunk.to_numpy(dtype=float)
+        values = values[np.isfinite(values).all(axis=1)]
+        if len(values):
+            yield values
+
+
+def fit_segmenter(data, features=VIDEO_FEATURES, n_segments=N_SEGMENTS, batch_size=BATCH_SIZE):
+    """
+    Fit a scaler, mini-batch KMeans and a 2-D PCA projection over streamed batches.
+
+    The data is read twice, one batch at a time: once to fit the scaler, then
+    to fit KMeans and PCA on the scaled batches. Rows with missing values are skipped.
+
+    Args:
+        data: DataFrame or path to a CSV/Parquet file.
+        features: Numeric columns to cluster on.
+        n_segments: Number of segments (KMeans clusters).
+        batch_size: Rows per batch.
+
+    Returns:
+        Dict with the features, fitted scaler, kmeans and pca models.
+    """
+    scaler = StandardScaler()
+    n_rows = 0
+    for values in _feature_batches(data, features, batch_size):
+        scaler.partial_fit(values)
+        n_rows += len(values)
+
+    if n_rows < max(n_segments, 2):
+        raise ValueError(f"❌ Need at least {max(n_segments, 2)} complete rows to build {n_segments} segments.")
+
+    kmeans = MiniBatchKMeans(n_clusters=n_segments, random_state=RANDOM_STATE, batch_size=batch_size, n_init=3)
+    pca = IncrementalPCA(n_components=2)
+    carry = None
+    for values in _feature_batches(data, features, batch_size):
+        scaled = scaler.transform(values)
+        # partial_fit needs at least n_segments (kmeans) / 2 (pca) rows per batch
+        if carry is not None:
+            scaled, carry = np.vstack([carry, scaled]), None
+        if len(scaled) < max(n_segments, 2):
+            carry = scaled
+            continue
+        # Data that fits in one batch gets a full fit instead of a single mini-batch step
+        if n_rows <= batch_size:
+            kmeans.fit(scaled)
+        else:
+            kmeans.partial_fit(scaled)
+        pca.partial_fit(scaled)
+
+    if carry is not None and not hasattr(kmeans, "cluster_centers_"):
+        kmeans.fit(carry)
+        pca.partial_fit(carry)
+
+    return {"features": list(features), "scaler": scaler, "kmeans": kmeans, "pca": pca}
+
+
+def _segment_assignments(segmenter, df):
+    values = df[segmenter["features"]].to_numpy(dtype=float)
+    valid = np.isfinite(values).all(axis=1)
+
+    assignments = pd.DataFrame({
+        "Segment": np.full(len(df), -1, dtype=np.int64),
+        "PC1": np.full(len(df), np.nan),
+        "PC2": np.full(len(df), np.nan),
+    })
+    if valid.any():
+        scaled = segmenter["scaler"].transform(values[valid])
+        assignments.loc[valid, "Segment"] = segmenter["kmeans"].predict(scaled)
+        assignments.loc[valid, ["PC1", "PC2"]] = segmenter["pca"].transform(scaled)
+    return assignments
+
+
+def assign_segments(segmenter, df):
+    """
+    Assign rows to the fitted segments, without refitting.
+
+    Args:
+        segmenter: Dict returned by fit_segmenter.
+        df: DataFrame with the segmenter's feature columns.
+
+    Returns:
+        Copy of df with "Segment" (-1 for rows with missing values), "PC1" and "PC2".
+    """
+    result = df.copy()
+    for column, values in _segment_assignments(segmenter, df).items():
+        result[column] = values.to_numpy()
+    return result
+
+
+def segment_summary(segmented, features):
+    """
+    Size and mean feature values of each segment.
+
+    Args:
+        segmented: DataFrame returned by assign_segments.
+        features: Feature columns to average.
+
+    Returns:
+        DataFrame with one row per segment.
+    """
+    assigned = segmented[segmented["Segment"] >= 0]
+    summary = assigned.groupby("Segment")[features].mean().round(2)
+    summary.insert(0, "Size", assigned.groupby("Segment").size())
+    return summary.reset_index()
+
+
+def commenter_features(comments):
+    """
+    Engagement metrics per commenter (user_ID).
+
+    Args:
+        comments: DataFrame, or the path of a CSV/Parquet file (queried without
+            loading it), with user_ID, Like_Count, Reply_Count and VidId columns.
+
+    Returns:
+        DataFrame with user_ID plus the COMMENTER_FEATURES columns, ordered by user_ID.
+    """
+    features = group_aggregate(comments, "user_ID", agg="count", count_name="Comments").merge(
+        group_aggregate(comments, "user_ID", ["Like_Count", "Reply_Count"]), on="user_ID",
+    ).rename(columns={"Like_Count": "Likes", "Reply_Count": "Replies"})
+
+    # One row per (user, video) pair, so the pairs per user are the distinct videos
+    videos = group_aggregate(comments, ["user_ID", "VidId"], agg="count").groupby("user_ID").size()
+    features["Videos"] = features["user_ID"].map(videos).fillna(0).astype("int64")
+    return features
+
+
+def _row_hashes(df, features):
+    return pd.util.hash_pandas_object(df[features], index=False).to_numpy()
+
+
+def get_segments(df, features=VIDEO_FEATURES, n_segments=N_SEGMENTS, cache_dir=None, refit=False, key=None):
+    """
+    Segmenter and per-row assignments of `df`, stored once per data version.
+
+    The segmenter is fitted once. When rows are only appended afterwards, the
+    stored segmenter is kept and just the new rows are assigned to it; the
+    centroids are refitted only if the data changed otherwise or on request.
+
+    Rows that are aggregates updated in place (e.g. one row per commenter) are
+    matched on `key` instead: only new rows and rows whose features changed
+    are assigned to the stored segmenter, whatever their order.
+
+    Args:
+        df: DataFrame to segment.
+        features: Numeric columns to cluster on.
+        n_segments: Number of segments.
+        cache_dir: Cache directory, or None to skip persistence.
+        refit: Refit the segmenter on all rows instead of reusing the stored one.
+        key: Optional column identifying each row (unique).
+
+    Returns:
+        Dict with the "segmenter" (see fit_segmenter), the "assignments"
+        DataFrame (SEGMENT_COLUMNS, one row per row of df) and the
+        "fingerprint", "n_rows" and "fitted_rows" of the data.
+    """
+    features = list(features)
+
+    def build(data):
+        segmenter = fit_segmenter(data, features, n_segments)
+        segments = {"segmenter": segmenter, "assignments": _segment_assignments(segmenter, data), "fitted_rows": len(data)}
+        if key is not None:
+            segments.update(keys=data[key].to_numpy(), row_hashes=_row_hashes(data, features))
+        return segments
+
+    def update(segments, data):
+        # Keep the previous assignment of each key whose features did not change
+        row_hashes = _row_hashes(data, features)
+        previous = pd.Series(np.arange(len(segments["keys"])), index=segments["keys"]).reindex(data[key].to_numpy())
+        unchanged = previous.notna().to_numpy(copy=True)
+        position = previous[unchanged].to_numpy(dtype=np.int64)
+        unchanged[unchanged] = segments["row_hashes"][position] == row_hashes[unchanged]
+        position = previous[unchanged].to_numpy(dtype=np.int64)
+
+        kept = segments["assignments"].iloc[position].set_axis(np.flatnonzero(unchanged))
+        assigned = _segment_assignments(segments["segmenter"], data[~unchanged]).set_axis(np.flatnonzero(~unchanged))
+        return {
+            "segmenter": segments["segmenter"],
+            "assignments": pd.concat([kept, assigned]).sort_index(),
+            "fitted_rows": segments["fitted_rows"],
+            "keys": data[key].to_numpy(),
+            "row_hashes": row_hashes,
+        }
+
+    def extend(segments, data):
+        new_rows = _segment_assignments(segments["segmenter"], data.iloc[segments["n_rows"]:])
+        return {
+            "segmenter": segments["segmenter"],
+            "assignments": pd.concat([segments["assignments"], new_rows], ignore_index=True),
+            "fitted_rows": segments["fitted_rows"],
+        }
+
+    # One stored version per feature set (and key) and number of segments
+    scope = hashlib.sha1("|".join(features + ([key] if key is not None else [])).encode("utf-8")).hexdigest()[:8]
+    if key is None:
+        return get_versioned_artifact(
+            df[features], cache_dir, f"{SEGMENTS_SUBDIR}_{scope}_{n_segments}",
+            build=build, extend=extend, rebuild=refit,
+        )
+    return get_versioned_artifact(
+        df[[key, *features]], cache_dir, f"{SEGMENTS_SUBDIR}_{scope}_{n_segments}",
+        build=build, update=update, rebuild=refit,
+    )
+
+
+def segment_rows(df, features=VIDEO_FEATURES, n_segments=N_SEGMENTS, cache_dir=None, refit=False, key=None):
+    """
+    Add the stored segment assignments to `df` (see get_segments).
+
+    Returns:
+        Copy of df with "Segment" (-1 for rows with missing values), "PC1" and "PC2".
+    """
+    segments = get_segments(df, features, n_segments, cache_dir, refit, key)
+    result = df.copy()
+    for column, values in segments["assignments"].items():
+        result[column] = values.to_numpy()
+    return result
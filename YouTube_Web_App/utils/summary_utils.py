@@ -0,0 +1,147 @@
+import pandas as pd
+
+from utils.cache_utils import get_versioned_artifact
+from utils.query_utils import group_aggregate, iter_chunks, source_columns, top_k
+
+# Number of rows kept in each precomputed top list
+TOP_K = 10
+
+# Metrics summed by the monthly / weekday / weekend rollups
+ROLLUP_METRICS = ["Views", "Subscribers gained", "Your Estmated Revenue (USD)"]
+
+# Rollup name -> column grouped by
+ROLLUPS = {
+    "monthly": "Publish Month",
+    "weekday": "Publish Weekday",
+    "weekend": "Is Weekend",
+}
+
+# Column projections used by the scatter charts
+PROJECTIONS = {
+    "revenue_vs_views": ["Views", "RPM (USD)", "Your Estmated Revenue (USD)"],
+    "ctr_vs_impressions": ["Video title", "Impressions", "Impressionss click-through rate (%)"],
+}
+
+# Points kept per scatter projection. Rows are sampled by the hash of their
+# values (bottom-k), so samples of appended rows merge into the same sample
+# a full rebuild would give.
+PROJECTION_POINTS = 5_000
+SAMPLE_KEY = "_sample_key"
+
+SUMMARY_SUBDIR = "dashboard_summary"
+
+
+def build_dashboard_summary(video_data):
+    """
+    Precompute the small tables rendered by the Visualizations page.
+
+    Args:
+        video_data: Video-level DataFrame (Processed_Video_Data.csv schema), or
+            the path of its CSV/Parquet file to run the queries lazily on the file.
+
+    Returns:
+        Dict with one DataFrame per table. Tables whose source columns are missing are None.
+    """
+    summary = {}
+    columns = set(source_columns(video_data))
+
+    summary["top_videos"] = (
+        top_k(video_data, "Views", k=TOP_K, columns=["Video title", "Views"])
+        if {"Video title", "Views"} <= columns else None
+    )
+
+    metrics = [col for col in ROLLUP_METRICS if col in columns]
+    for name, by in ROLLUPS.items():
+        summary[name] = group_aggregate(video_data, by, metrics) if by in columns and metrics else None
+
+    for name, projection in PROJECTIONS.items():
+        summary[name] = _sample_projection(video_data, projection) if set(projection) <= columns else None
+
+    return summary
+
+
+def _bottom_k(frame, n=PROJECTION_POINTS):
+    # Ties on the key are broken by the values, so the sample does not depend on row order
+    return frame.sort_values([SAMPLE_KEY, *frame.columns.drop(SAMPLE_KEY)]).head(n).reset_index(drop=True)
+
+
+def _sample_projection(source, projection, n=PROJECTION_POINTS):
+    """
+    Deterministic sample of at most n rows of the projected columns, streamed chunk by chunk.
+
+    Returns:
+        DataFrame with the projection columns plus SAMPLE_KEY (the row hash used for sampling).
+    """
+    sample = None
+    for chunk in iter_chunks(source, columns=projection):
+        # Same column order as frame sources, so file and frame samples hash alike
+        chunk = chunk[projection].reset_index(drop=True)
+        chunk[SAMPLE_KEY] = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        sample = _bottom_k(chunk if sample is None else pd.concat([sample, chunk], ignore_index=True), n)
+    if sample is None:
+        return pd.DataFrame(columns=[*projection, SAMPLE_KEY])
+    return sample
+
+
+def update_dashboard_summary(summary, video_data):
+    """
+    Fold rows appended since `summary` was built into it, without rescanning old rows.
+
+    Args:
+        summary: Summary of video_data.iloc[:summary["n_rows"]].
+        video_data: Full DataFrame, old rows first.
+
+    Returns:
+        Summary of the full DataFrame.
+    """
+    new_rows = video_data.iloc[summary["n_rows"]:]
+    delta = build_dashboard_summary(new_rows)
+    updated = {}
+
+    # Top-K of the union is the top-K of both top-K lists
+    if summary["top_videos"] is not None and delta["top_videos"] is not None:
+        merged = pd.concat([summary["top_videos"], delta["top_videos"]], ignore_index=True)
+        updated["top_videos"] = merged.nlargest(TOP_K, "Views").reset_index(drop=True)
+    else:
+        updated["top_videos"] = delta["top_videos"]
+
+    # Rollups are sums, so partial rollups merge by summing again
+    for name, by in ROLLUPS.items():
+        if summary[name] is not None and delta[name] is not None:
+            metrics = [col for col in summary[name].columns if col != by]
+            updated[name] = group_aggregate(pd.concat([summary[name], delta[name]]), by, metrics)
+        else:
+            updated[name] = delta[name]
+
+    # The sample of the union is the bottom-k of both samples
+    for name in PROJECTIONS:
+        if summary[name] is not None and delta[name] is not None:
+            updated[name] = _bottom_k(pd.concat([summary[name], delta[name]], ignore_index=True))
+        else:
+            updated[name] = delta[name]
+
+    return updated
+
+
+def get_dashboard_summary(video_data, cache_dir=None, source=None):
+    """
+    Return the dashboard summary of `video_data`, reusing stored summaries when possible.
+
+    Summaries are stored under <cache_dir>/dashboard_summary/, one per data
+    version. If the data only gained rows since the last stored summary, that
+    summary is updated incrementally instead of being rebuilt.
+
+    Args:
+        video_data: Video-level DataFrame.
+        cache_dir: Channel cache directory, or None to skip persistence.
+        source: Optional path of the file video_data was loaded from; full
+            builds then run as lazy queries on the file instead of the frame.
+
+    Returns:
+        Dashboard summary dict (see build_dashboard_summary).
+    """
+    return get_versioned_artifact(
+        video_data, cache_dir, SUMMARY_SUBDIR,
+        build=lambda df: build_dashboard_summary(df if source is None else source),
+        extend=update_dashboard_summary,
+    )
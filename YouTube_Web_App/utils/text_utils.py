@@ -0,0 +1,263 @@
+import io
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from wordcloud import STOPWORDS, WordCloud
+
+from utils.cache_utils import get_file_artifact, get_versioned_artifact, write_bytes_atomic
+from utils.query_utils import iter_chunks, source_columns
+
+# clean_comment has punctuation stripped, so "don't" shows up as "dont"
+DEFAULT_STOPWORDS = frozenset(STOPWORDS | {word.replace("'", "") for word in STOPWORDS})
+
+# Columns term counts are broken down by
+TERM_KEYS = ("Sentiment", "VidId")
+
+# Comments counted per chunk (and per worker task)
+CHUNK_SIZE = 100_000
+
+TERMS_SUBDIR = "term_counts"
+WORDCLOUD_SUBDIR = "wordclouds"
+WORDCLOUD_MAX_WORDS = 200
+
+
+def clean_comments(comments):
+    """
+    Add the `clean_comment` column and normalize `Sentiment` labels.
+
+    Args:
+        comments: Comments DataFrame with "Comments" and "Sentiment" columns.
+
+    Returns:
+        Copy of the DataFrame with `clean_comment` added and lowercased `Sentiment`.
+    """
+    comments = comments.copy()
+    comments['clean_comment'] = comments['Comments'].str.replace(r'[^\w\s]', '', regex=True)  # Remove punctuation
+    comments['clean_comment'] = comments['clean_comment'].str.replace(r'\s+', ' ', regex=True).str.strip()  # Remove extra spaces
+
+    # Clean the Sentiment column by stripping spaces and converting to lowercase
+    if 'Sentiment' in comments.columns:
+        comments['Sentiment'] = comments['Sentiment'].str.strip().str.lower()
+    return comments
+
+
+def extract_terms(text, ngram_range=(1, 1), stopwords=DEFAULT_STOPWORDS):
+    """
+    Lowercased terms (words and n-grams) of a cleaned comment, without stopwords.
+
+    Args:
+        text: Comment text (punctuation already removed).
+        ngram_range: (min_n, max_n) sizes of the n-grams to produce.
+        stopwords: Words dropped before building n-grams.
+
+    Returns:
+        List of terms; n-grams are space-joined.
+    """
+    if not isinstance(text, str):
+        return []
+
+    tokens = [token for token in text.lower().split() if len(token) > 1 and token not in stopwords]
+    min_n, max_n = ngram_range
+    return [
+        " ".join(tokens[i:i + n])
+        for n in range(min_n, max_n + 1)
+        for i in range(len(tokens) - n + 1)
+    ]
+
+
+def count_terms(df, text_column="clean_comment", keys=TERM_KEYS, ngram_range=(1, 1)):
+    """
+    Term counts of a frame of comments, overall and per value of each key column.
+
+    Args:
+        df: DataFrame with the text column and key columns.
+        text_column: Column holding the cleaned comment text.
+        keys: Columns to break the counts down by.
+        ngram_range: (min_n, max_n) sizes of the n-grams to count.
+
+    Returns:
+        Dict {"all": Counter, "by": {key: {value: Counter}}}.
+    """
+    counts = {"all": Counter(), "by": {key: {} for key in keys}}
+    columns = [df[text_column]] + [df[key] for key in keys]
+
+    for text, *values in zip(*columns):
+        terms = extract_terms(text, ngram_range)
+        if not terms:
+            continue
+        counts["all"].update(terms)
+        for key, value in zip(keys, values):
+            counts["by"][key].setdefault(value, Counter()).update(terms)
+
+    return counts
+
+
+def merge_term_counts(counts, other):
+    """
+    Add the term counts of `other` into `counts` (in place).
+
+    Returns:
+        The updated `counts`.
+    """
+    counts["all"].update(other["all"])
+    for key, by_value in other["by"].items():
+        target = counts["by"].setdefault(key, {})
+        for value, counter in by_value.items():
+            target.setdefault(value, Counter()).update(counter)
+    return counts
+
+
+def _count_chunk(args):
+    chunk, text_column, keys, ngram_range, clean = args
+    if clean:
+        chunk = clean_comments(chunk)
+    return count_terms(chunk, text_column, keys, ngram_range)
+
+
+def build_term_counts(data, text_column="clean_comment", keys=TERM_KEYS, ngram_range=(1, 1),
+                      chunk_size=CHUNK_SIZE, max_workers=1, clean=False):
+    """
+    Stream a comments source in chunks and merge the per-chunk term counts.
+
+    Args:
+        data: DataFrame or path to a CSV/Parquet file.
+        text_column: Column holding the cleaned comment text.
+        keys: Columns to break the counts down by.
+        ngram_range: (min_n, max_n) sizes of the n-grams to count.
+        chunk_size: Comments per chunk.
+        max_workers: Processes used to count chunks.
+        clean: Read the raw "Comments" column and run clean_comments on each
+            chunk (for stored files, which have no cleaned text column).
+
+    Returns:
+        Term counts dict (see count_terms).
+    """
+    keys = tuple(keys)
+    text_source = "Comments" if clean else text_column
+    chunks = iter_chunks(data, columns=[text_source, *keys], chunk_size=chunk_size)
+    tasks = ((chunk, text_column, keys, ngram_range, clean) for chunk in chunks)
+    counts = {"all": Counter(), "by": {key: {} for key in keys}}
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for partial in pool.map(_count_chunk, tasks):
+                merge_term_counts(counts, partial)
+    else:
+        for task in tasks:
+            merge_term_counts(counts, _count_chunk(task))
+
+    return counts
+
+
+def get_term_counts(df, cache_dir=None, text_column="clean_comment", keys=TERM_KEYS, ngram_range=(1, 1)):
+    """
+    Term counts of `df`, stored once per data version and extended when rows are appended.
+
+    Args:
+        df: Comments DataFrame, or the path of a stored comments file. Files
+            are streamed and cleaned chunk by chunk and keyed on their version
+            (see get_file_artifact), so they are never loaded whole.
+        cache_dir: Cache directory, or None to skip persistence.
+        text_column: Column holding the cleaned comment text.
+        keys: Columns to break the counts down by.
+        ngram_range: (min_n, max_n) sizes of the n-grams to count.
+
+    Returns:
+        Term counts dict, plus the "ngram_range" and the "fingerprint" (and for
+        DataFrames "n_rows") of the data.
+    """
+    name = f"{TERMS_SUBDIR}_{ngram_range[0]}_{ngram_range[1]}"
+    if isinstance(df, str):
+        keys = tuple(key for key in keys if key in source_columns(df))
+        return get_file_artifact(
+            df, cache_dir, f"{name}_file",
+            build=lambda path: {
+                **build_term_counts(path, text_column, keys, ngram_range, clean=True),
+                "ngram_range": tuple(ngram_range),
+            },
+        )
+
+    keys = tuple(key for key in keys if key in df.columns)
+    source = df[[text_column, *keys]]
+
+    def build(data):
+        return {**build_term_counts(data, text_column, keys, ngram_range), "ngram_range": tuple(ngram_range)}
+
+    def extend(counts, data):
+        return merge_term_counts(
+            {"all": counts["all"], "by": counts["by"], "ngram_range": tuple(ngram_range)},
+            build(data.iloc[counts["n_rows"]:]),
+        )
+
+    return get_versioned_artifact(source, cache_dir, name, build=build, extend=extend)
+
+
+def _select_counter(counts, key=None, value=None):
+    if key is None:
+        return counts["all"]
+    return counts["by"].get(key, {}).get(value, Counter())
+
+
+def top_terms(counts, n=20, key=None, value=None):
+    """
+    Most frequent terms, overall or for one value of a key column.
+
+    Args:
+        counts: Term counts dict.
+        n: Number of terms to return.
+        key: Key column (e.g. "Sentiment"), or None for all comments.
+        value: Value of the key column (e.g. "positive").
+
+    Returns:
+        DataFrame with "Term" and "Count" columns.
+    """
+    return pd.DataFrame(_select_counter(counts, key, value).most_common(n), columns=["Term", "Count"])
+
+
+def wordcloud_png(counts, cache_dir=None, key=None, value=None, max_words=WORDCLOUD_MAX_WORDS):
+    """
+    Render a word cloud from term counts, reusing the stored image for the same data version.
+
+    Args:
+        counts: Term counts dict (from get_term_counts when caching).
+        cache_dir: Cache directory, or None to skip persistence.
+        key: Key column (e.g. "Sentiment"), or None for all comments.
+        value: Value of the key column.
+        max_words: Number of most frequent terms drawn.
+
+    Returns:
+        PNG image bytes.
+    """
+    fingerprint = counts.get("fingerprint")
+    path = None
+    if cache_dir is not None and fingerprint:
+        image_dir = os.path.join(cache_dir, WORDCLOUD_SUBDIR)
+        scope = re.sub(r"[^A-Za-z0-9_-]", "_", f"{counts.get('ngram_range')}_{key}_{value}_{max_words}")
+        path = os.path.join(image_dir, f"{fingerprint}_{scope}.png")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+
+    frequencies = dict(_select_counter(counts, key, value).most_common(max_words))
+    image = WordCloud(width=800, height=400, background_color="white", max_words=max_words)
+    image = image.generate_from_frequencies(frequencies).to_image()
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    png = buffer.getvalue()
+
+    if path is not None:
+        os.makedirs(image_dir, exist_ok=True)
+        # Images of older data versions are never served again (temp files of
+        # concurrent writers are left alone)
+        for file_name in os.listdir(image_dir):
+            if file_name.endswith(".png") and not file_name.startswith(fingerprint):
+                try:
+                    os.remove(os.path.join(image_dir, file_name))
+                except FileNotFoundError:
+                    pass
+        write_bytes_atomic(path, png)
+
+    return png
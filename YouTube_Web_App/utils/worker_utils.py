@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.data_utils import (DATA_FILES, aggregate_channels, cache_dir, convert_to_parquet, dataset_path, load_all_data,
+                              load_dataset)
+from utils.model_utils import load_model
+
+# One worker: jobs write to the same cache directories, so they run one at a time
+MAX_WORKERS = 1
+
+# Finished jobs kept for the status view
+MAX_JOB_HISTORY = 50
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="precompute")
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _update_job(job_id, **fields):
+    with _lock:
+        _jobs[job_id].update(fields)
+
+
+def _run_job(job_id, steps):
+    _update_job(job_id, status="running", started=time.time())
+    for index, (label, step) in enumerate(steps):
+        _update_job(job_id, message=label, progress=index / len(steps))
+        try:
+            step()
+        except Exception as e:
+            _update_job(
+                job_id, status="failed", finished=time.time(),
+                message=f"{label} failed: {e}", error=traceback.format_exc(),
+            )
+            return
+    _update_job(job_id, status="done", progress=1.0, message="Done", finished=time.time())
+
+
+def submit_job(name, steps):
+    """
+    Queue a background job made of sequential steps.
+
+    Args:
+        name: Job name shown in the status view.
+        steps: List of (label, callable) pairs, run in order. Progress is the
+            fraction of completed steps; the job stops at the first failing step.
+
+    Returns:
+        Job ID.
+    """
+    job_id = uuid.uuid4().hex[:8]
+    with _lock:
+        _jobs[job_id] = {
+            "id": job_id, "name": name, "status": "queued", "progress": 0.0,
+            "message": "Waiting for worker", "submitted": time.time(),
+            "started": None, "finished": None, "error": None,
+        }
+        # Drop the oldest finished jobs beyond the history limit
+        finished = [job for job in _jobs.values() if job["status"] in ("done", "failed")]
+        for job in sorted(finished, key=lambda job: job["submitted"])[:max(0, len(_jobs) - MAX_JOB_HISTORY)]:
+            del _jobs[job["id"]]
+
+    _executor.submit(_run_job, job_id, list(steps))
+    return job_id
+
+
+def list_jobs():
+    """
+    Snapshot of all known jobs, newest first.
+    """
+    with _lock:
+        jobs = [dict(job) for job in _jobs.values()]
+    return sorted(jobs, key=lambda job: job["submitted"], reverse=True)
+
+
+def has_active_jobs():
+    """
+    True while any job is queued or running.
+    """
+    with _lock:
+        return any(job["status"] in ("queued", "running") for job in _jobs.values())
+
+
+def precompute_channel_steps(channel=None, data_dir="data"):
+    """
+    Steps that rebuild every cached artifact of a channel after a data upload.
+
+    Converts the CSVs to Parquet, reloads the dataset cache, and builds what
+    the pages read: the dashboard summary, video and commenter segments,
+    comment term counts, duplicate comment clusters, the drift reference and
+    the cross-channel totals.
+
+    Args:
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        List of (label, callable) steps for submit_job.
+    """
+    # Imported here so the worker module stays cheap to import from every page
+    from utils.dedup_utils import get_duplicate_clusters
+    from utils.drift_utils import get_drift_monitor, get_drift_reference
+    from utils.query_utils import source_columns
+    from utils.segment_utils import COMMENTER_FEATURES, VIDEO_FEATURES, commenter_features, get_segments
+    from utils.summary_utils import ROLLUP_METRICS, get_dashboard_summary
+    from utils.text_utils import get_term_counts
+
+    channel_cache = cache_dir(channel, data_dir)
+    loaded = {}
+
+    def convert(key):
+        def step():
+            try:
+                convert_to_parquet(key, channel, data_dir)
+            except ImportError:
+                pass  # No Parquet engine installed: pages keep reading the CSV
+        return step
+
+    def reload_datasets():
+        load_dataset.clear()
+        # Same call as the pages, so they hit the entries warmed here
+        loaded["video_data"], _, _, loaded["comments"] = load_all_data(data_dir=data_dir, channel=channel)
+
+    def build_summary():
+        if not loaded["video_data"].empty:
+            get_dashboard_summary(
+                loaded["video_data"], cache_dir=channel_cache, source=dataset_path("video_data", channel, data_dir)
+            )
+
+    def build_segments():
+        video_data = loaded["video_data"]
+        if all(col in video_data.columns for col in VIDEO_FEATURES):
+            get_segments(video_data, VIDEO_FEATURES, cache_dir=channel_cache)
+
+    def build_term_counts():
+        # Same source as the Sentiment page: the stored file, streamed chunk by chunk
+        comments_path = dataset_path("comments", channel, data_dir)
+        if comments_path is not None:
+            get_term_counts(comments_path, cache_dir=channel_cache)
+
+    def build_commenter_segments():
+        comments_path = dataset_path("comments", channel, data_dir)
+        required = {"user_ID", "VidId", "Like_Count", "Reply_Count"}
+        if comments_path is not None and required <= set(source_columns(comments_path)):
+            get_segments(commenter_features(comments_path), COMMENTER_FEATURES, cache_dir=channel_cache, key="user_ID")
+
+    def build_duplicate_clusters():
+        comments_path = dataset_path("comments", channel, data_dir)
+        if comments_path is not None and "Comments" in source_columns(comments_path):
+            get_duplicate_clusters(comments_path, cache_dir=channel_cache, max_workers=min(os.cpu_count() or 1, 4))
+
+    def build_drift_reference():
+        # Same call as the pages, so the model comes from the shared cache
+        model = load_model()
+        video_data = loaded["video_data"]
+        if model is not None and set(model.get_booster().feature_names) <= set(video_data.columns):
+            reference, fingerprint = get_drift_reference(video_data, model, channel, data_dir)
+            get_drift_monitor(reference, cache_dir=channel_cache, reference_fingerprint=fingerprint)
+
+    def build_channel_totals():
+        # Same call as the Visualizations page, so it hits the entry warmed here
+        aggregate_channels("video_data", values=tuple(ROLLUP_METRICS), data_dir=data_dir)
+
+    steps = [(f"Converting {file_name} to Parquet", convert(key)) for key, file_name in DATA_FILES.items()]
+    steps += [
+        ("Loading datasets", reload_datasets),
+        ("Building dashboard summary", build_summary),
+        ("Fitting video segments", build_segments),
+        ("Counting comment terms", build_term_counts),
+        ("Fitting commenter segments", build_commenter_segments),
+        ("Detecting duplicate comments", build_duplicate_clusters),
+        ("Building drift reference", build_drift_reference),
+        ("Summing cross-channel totals", build_channel_totals),
+    ]
+    return steps
+
+
+def warm_model_steps():
+    """
+    Steps that drop the cached model and load the new one into the shared cache.
+
+    Returns:
+        List of (label, callable) steps for submit_job.
+    """
+    def warm():
+        load_model.clear()
+        # Same call as the pages, so they hit the entry warmed here
+        if load_model() is None:
+            raise ValueError("❌ Could not load the uploaded model file.")
+
+    return [("Loading model", warm)]
+
+
+def export_extract_steps(out_dir, tables, channel=None, data_dir="data"):
+    """
+    Steps that incrementally export a channel's datasets for Power BI.
+
+    Args:
+        out_dir: Extract root folder.
+        tables: Table names to export: DATA_FILES keys and/or "predictions".
+        channel: Channel key, or None for the shared data/ directory.
+        data_dir: Root data directory.
+
+    Returns:
+        List of (label, callable) steps for submit_job.
+    """
+    from utils.export_utils import export_extract, predictions_table
+    from utils.model_utils import predict_views_batch
+
+    loaded = {}
+
+    def load():
+        # Same call as the pages, so the cached datasets are reused
+        datasets = load_all_data(data_dir=data_dir, channel=channel)
+        loaded.update(zip(DATA_FILES, datasets))
+
+    def export(table):
+        def step():
+            if table == "predictions":
+                model = load_model()
+                if model is None:
+                    raise ValueError("❌ Model not loaded. Please load a valid model first.")
+                df = predictions_table(loaded["video_data"], predict_views_batch(model, loaded["video_data"]))
+            else:
+                df = loaded[table]
+            if not df.empty:
+                export_extract({table: df}, out_dir)
+        return step
+
+    return [("Loading datasets", load)] + [(f"Exporting {table}", export(table)) for table in tables]